@@ -13,13 +13,31 @@ Created on Fri Jul 27 13:26:20 2018
 ####################################################################################################
 # Import the following Python packages
 
-import itertools
+import argparse
+import atexit
+import collections
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
 import numpy as np
-import pylab
-import matplotlib
-from math import exp
-from math import log
-from matplotlib import pyplot as plt
+
+import cvm_core
+
+# NOTE: the numeric core of this program is the module cvm_core (cvm_core.py, next to this file); 
+#   this program adds the printing, plotting, export, benchmark and command-line layer on top of 
+#   it, and the sweep worker processes load only the core. 
+#   pylab / matplotlib are NOT imported here. The numeric core does not need them, and importing 
+#   them costs hundreds of milliseconds in every worker process; they are imported inside the 
+#   printing and plotting layer, only when a figure is actually drawn. benchmarkStartupTime 
+#   checks that this stays true. 
 
 
 ####################################################################################################
@@ -97,202 +115,314 @@ def welcome ():
 ####################################################################################################
 ####################################################################################################
 #
-# Function to create the x-values. 
+# Startup benchmark for the numeric path. 
+# A fresh interpreter imports the numeric core, cvm_core (as a sweep worker does), and reports 
+#   how long that took and whether matplotlib got imported along the way. The best of `repeat` 
+#   runs is compared against budgetSeconds; exceeding it, or finding matplotlib loaded, raises an 
+#   AssertionError. 
 #
 ####################################################################################################
 ####################################################################################################
-    
-def createXValues(xArray, xTotalSteps, xStep, xIncr):
-    newX = 0.0
-    
-    for j in range (0,xTotalSteps, xStep):
-        newX = newX + xIncr
-        xArray[j] = newX
 
-    
-    return (xArray)
-    
-####################################################################################################
-####################################################################################################
-#
-# Function to create the x-entrlpy. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createNegXEntropyValues(xArray, negXEntropyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        x = xArray[j]
-        negXEntropyArray[j] = x*log(x) + (1-x)*log(1-x)
-    
-    return (negXEntropyArray)
-    
-     
-####################################################################################################
-####################################################################################################
-#
-# Function to create the y-entropy. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createNegYEntropyValues(xArray, negYEntropyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        x = xArray[j]
-        y1=x*x
-        y2=x*(1.-x)
-        y3=(1.-x)*(1.-x)
-        negYEntropyArray[j] = y1*log(y1) + 2.*(y2)*log(y2) + y3*log(y3)
-    
-    return (negYEntropyArray)
-    
-####################################################################################################
-####################################################################################################
-#
-# Function to create the z-entropy. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createNegZEntropyValues(xArray, negZEntropyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        x = xArray[j]
-        q = 1.0-x
-        z1=x*x*x
-        z2=x*x*q
-        z3=x*q*x
-        z4=q*x*q
-        z5=q*q*x
-        z6=q*q*q
-        negZEntropyArray[j] = z1*log(z1) + 2.*(z2)*log(z2) + z3*log(z3) + z4*log(z4) + 2.*z5*log(z5) + z6*log(z6)
-    
-    return (negZEntropyArray)
-    
+_STARTUP_PROBE = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import cvm_core
+print(time.perf_counter() - start, 'matplotlib' in sys.modules)
+"""
 
-####################################################################################################
-####################################################################################################
-#
-# Function to create the numerator of the total entropy. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createNegYWEntropyValues(xArray, negYEntropyArray, negYWEntropyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        negY = negYEntropyArray[j]
-        negW= negYEntropyArray[j]        
-        negYWEntropyArray[j] = 2*negY + negW
-    
-    return (negYWEntropyArray)     
 
+def benchmarkStartupTime (budgetSeconds=0.5, repeat=5):
 
+    best = np.inf
+    for r in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _STARTUP_PROBE, os.path.dirname(os.path.abspath(cvm_core.__file__))], 
+                                check=True, capture_output=True, text=True).stdout.split()
+        elapsed, matplotlibLoaded = float(output[0]), output[1] == 'True'
+        if matplotlibLoaded:
+            raise AssertionError('Importing the numeric core also imported matplotlib.')
+        best = min(best, elapsed)
 
-####################################################################################################
-####################################################################################################
-#
-# Function to create the denominator of the total entropy. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createNegXZEntropyValues(xArray, negXEntropyArray, negZEntropyArray, negXZEntropyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        negX = negXEntropyArray[j]
-        negZ = negZEntropyArray[j]        
-        negXZEntropyArray[j] = 2*negZ + negX
-    
-    return (negXZEntropyArray)     
-    
+    print ()
+    print (' Import time of the numeric core: %.1f ms (budget %.1f ms)' % (1000*best, 1000*budgetSeconds))
+    print ()
+    if best > budgetSeconds:
+        raise AssertionError('Import took %.3f s, over the %.3f s budget.' % (best, budgetSeconds))
+    return (best)
 
-####################################################################################################
-####################################################################################################
-#
-# Function to create the denominator of the total entropy. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createNegTotEntropyValues(xArray, negYWEntropyArray, negXZEntropyArray, negTotEntropyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        negYWEntropy = negYWEntropyArray[j]
-        negXZEntropy = negXZEntropyArray[j]        
-        negTotEntropyArray[j] = -(negYWEntropy - negXZEntropy)
-    return (negTotEntropyArray)     
 
- 
 ####################################################################################################
 ####################################################################################################
 #
-# Function to create the activation enthalpy of a simplle Ising system. 
+# PRINTING AND PLOTTING LAYER 
+# The calculation core is the module cvm_core, and needs only NumPy and the standard library. 
+#   Everything in this program prints, draws or exports results, and imports matplotlib on demand. 
 #
 ####################################################################################################
 ####################################################################################################
-    
-def createActivationEnthalpyValues(xArray, activEnthalpyArray, eps0, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        x = xArray[j] 
-        activEnthalpyArray[j] = eps0*x
-    return (activEnthalpyArray)     
 
- 
-####################################################################################################
-####################################################################################################
-#
-# Function to create the free energy of a simplle Ising system. 
-#
-####################################################################################################
-####################################################################################################
-    
-def createInteractEnthalpyValues(xArray, interactEnthalpyArray, eps1, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        x = xArray[j]
-        interactEnthalpyArray[j] = -eps1*x*x 
-    return (interactEnthalpyArray)     
- 
-    
 
 ####################################################################################################
 ####################################################################################################
 #
-# Function to create the free energy of a simplle Ising system. 
+# Bulk tabular output. 
 #
-####################################################################################################
-####################################################################################################
-    
-def createSimpleIsingValues(activEnthalpyArray, interactEnthalpyArray, negXEntropyArray, freeEnergyArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        negXEntropy = negXEntropyArray[j]
-        activEnthalpy = activEnthalpyArray[j] 
-        interactEnthalpy = interactEnthalpyArray[j]
-        freeEnergyArray[j] = activEnthalpy + interactEnthalpy + negXEntropy
-    return (freeEnergyArray)      
+# exportThermoTable writes a whole results table (a THERMO_DTYPE table or a dict of columns; every 
+#   column in THERMO_COLUMNS, or the chosen subset) in one call, in any of these formats, picked 
+#   from the file extension or fileFormat: 
+#     'csv'       .csv        text, one header line; rows are formatted in one vectorized step 
+#     'npy'       .npy        one structured NumPy array 
+#     'npz'       .npz        one array per column 
+#     'columnar'  directory   one contiguous .npy file per column (Arrow/Parquet-style layout, 
+#                             each column can be memory-mapped on its own) 
+#     'parquet'   .parquet    Apache Parquet (needs pyarrow) 
+#     'hdf5'      .h5/.hdf5   one HDF5 dataset per column (needs h5py) 
+# ThermoTableWriter does the same chunk by chunk, for the streaming pipeline: it is a sink 
+#   (consume/close), so any sweep can be written out with constant memory. Every format except 
+#   'npz' can be streamed; the .npy headers are rewritten with the final row count on close(). 
+#
+####################################################################################################
+####################################################################################################
+
+EXPORT_FORMATS = ('csv', 'npy', 'npz', 'columnar', 'parquet', 'hdf5')
+
+_EXPORT_EXTENSIONS = {'.csv': 'csv', '.npy': 'npy', '.npz': 'npz', '.parquet': 'parquet', '.h5': 'hdf5', '.hdf5': 'hdf5'}
+
+
+def exportFormatFromPath (path, fileFormat=None):
+    if fileFormat is None:
+        fileFormat = _EXPORT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'columnar')
+    if fileFormat not in EXPORT_FORMATS:
+        raise ValueError('Unknown export format %r; expected one of %s.' % (fileFormat, EXPORT_FORMATS))
+    return (fileFormat)
+
+
+# All rows of a block are formatted by a single %-operation on one repeated row format, 
+#   rather than one Python-level format call per value. 
+def formatTableRows (rowFormat, columnArrays):
+    block = np.column_stack(columnArrays)
+    if len(block) == 0:
+        return ('')
+    return (((rowFormat + '\n') * len(block)) % tuple(block.ravel().tolist()))
+
+
+def _importOptional (moduleName, fileFormat):
+    import importlib
+    try:
+        return (importlib.import_module(moduleName))
+    except ImportError:
+        raise ImportError('The %r export format needs the optional %s package.' % (fileFormat, moduleName.split('.')[0]))
+
+
+# A .npy header with room for any row count, so it can be rewritten in place when the final 
+#   number of rows is known. 
+def _npyHeader (dtype, nRows):
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (np.lib.format.dtype_to_descr(dtype), nRows)
+    header = header.ljust(len(header) + 24 - len(str(nRows)))
+    totalLength = -(-(10 + len(header) + 1) // 64) * 64
+    header = header.ljust(totalLength - 10 - 1) + '\n'
+    return (b'\x93NUMPY\x01\x00' + np.uint16(len(header)).tobytes() + header.encode('latin1'))
+
+
+class ThermoTableWriter:
+
+    def __init__ (self, path, fileFormat=None, columns=cvm_core.THERMO_COLUMNS, numberFormat='%.10g'):
+        self.path = path
+        self.fileFormat = exportFormatFromPath(path, fileFormat)
+        self.columns = tuple(columns)
+        self.numberFormat = numberFormat
+        self.nRows = 0
+        self.rowDtype = np.dtype([(name, np.float64) for name in self.columns])
+
+        if self.fileFormat == 'csv':
+            self.fileHandle = open(path, 'w')
+            self.fileHandle.write(','.join(self.columns) + '\n')
+        elif self.fileFormat == 'npy':
+            self.fileHandle = open(path, 'wb')
+            self.fileHandle.write(_npyHeader(self.rowDtype, 0))
+        elif self.fileFormat == 'columnar':
+            os.makedirs(path, exist_ok=True)
+            self.columnHandles = {}
+            for name in self.columns:
+                self.columnHandles[name] = open(os.path.join(path, name + '.npy'), 'wb')
+                self.columnHandles[name].write(_npyHeader(np.dtype(np.float64), 0))
+        elif self.fileFormat == 'parquet':
+            self.pyarrow = _importOptional('pyarrow', 'parquet')
+            parquet = _importOptional('pyarrow.parquet', 'parquet')
+            schema = self.pyarrow.schema([(name, self.pyarrow.float64()) for name in self.columns])
+            self.parquetWriter = parquet.ParquetWriter(path, schema)
+        elif self.fileFormat == 'hdf5':
+            h5py = _importOptional('h5py', 'hdf5')
+            self.h5File = h5py.File(path, 'w')
+            for name in self.columns:
+                self.h5File.create_dataset(name, shape=(0,), maxshape=(None,), dtype=np.float64, chunks=True)
+        else:
+            raise ValueError("The %r format cannot be streamed; use exportThermoTable." % self.fileFormat)
+
+    def consume (self, thermoTable):
+        nRows = len(thermoTable[self.columns[0]])
+        if self.fileFormat == 'csv':
+            rowFormat = ','.join([self.numberFormat] * len(self.columns))
+            self.fileHandle.write(formatTableRows(rowFormat, [thermoTable[name] for name in self.columns]))
+        elif self.fileFormat == 'npy':
+            block = np.empty(nRows, dtype=self.rowDtype)
+            for name in self.columns:
+                block[name] = thermoTable[name]
+            self.fileHandle.write(block.tobytes())
+        elif self.fileFormat == 'columnar':
+            for name in self.columns:
+                self.columnHandles[name].write(np.ascontiguousarray(thermoTable[name], dtype=np.float64).tobytes())
+        elif self.fileFormat == 'parquet':
+            arrays = [self.pyarrow.array(np.ascontiguousarray(thermoTable[name])) for name in self.columns]
+            self.parquetWriter.write_table(self.pyarrow.Table.from_arrays(arrays, names=list(self.columns)))
+        elif self.fileFormat == 'hdf5':
+            for name in self.columns:
+                dataset = self.h5File[name]
+                dataset.resize((self.nRows + nRows,))
+                dataset[self.nRows:] = thermoTable[name]
+        self.nRows += nRows
+
+    def write (self, thermoTable):
+        self.consume(thermoTable)
+
+    def close (self):
+        if self.fileFormat == 'csv':
+            self.fileHandle.close()
+        elif self.fileFormat == 'npy':
+            self.fileHandle.seek(0)
+            self.fileHandle.write(_npyHeader(self.rowDtype, self.nRows))
+            self.fileHandle.close()
+        elif self.fileFormat == 'columnar':
+            for handle in self.columnHandles.values():
+                handle.seek(0)
+                handle.write(_npyHeader(np.dtype(np.float64), self.nRows))
+                handle.close()
+        elif self.fileFormat == 'parquet':
+            self.parquetWriter.close()
+        elif self.fileFormat == 'hdf5':
+            self.h5File.close()
+        return ({'path': self.path, 'format': self.fileFormat, 'nRows': self.nRows})
+
+
+class ThermoFileSink (ThermoTableWriter):
+
+    def __init__ (self, path, columns=cvm_core.THERMO_COLUMNS, fmt='%.10g'):
+        ThermoTableWriter.__init__(self, path, 'csv', columns, fmt)
+
+
+def exportThermoTable (thermoTable, path, fileFormat=None, columns=cvm_core.THERMO_COLUMNS, numberFormat='%.10g'):
+
+    fileFormat = exportFormatFromPath(path, fileFormat)
+    if fileFormat == 'npz':
+        np.savez(path, **{name: np.ascontiguousarray(thermoTable[name]) for name in columns})
+        return ({'path': path, 'format': fileFormat, 'nRows': len(thermoTable[columns[0]])})
+    # Written in chunk-sized row blocks, so that e.g. the CSV text never holds the whole table
+    writer = ThermoTableWriter(path, fileFormat, columns, numberFormat)
+    nRows = len(thermoTable[columns[0]])
+    for lo in range(0, nRows, cvm_core.DEFAULT_CHUNK_SIZE):
+        if isinstance(thermoTable, dict):
+            writer.consume({name: thermoTable[name][lo:lo + cvm_core.DEFAULT_CHUNK_SIZE] for name in columns})
+        else:
+            writer.consume(thermoTable[lo:lo + cvm_core.DEFAULT_CHUNK_SIZE])
+    return (writer.close())
+
+
+####################################################################################################
+####################################################################################################
+#
+# Headless, non-blocking rendering of the equilibrium figures. 
+#
+# In headless mode plotAndPrintEqulibriumResults does not call pylab.show(); instead 
+#   renderEquilibriumFigures draws the same five figures with the Agg backend (through the 
+#   object-oriented Figure API, not pyplot, so it is safe off the main thread) on a background 
+#   thread, into one multi-page PDF (outputPath + '.pdf') and one PNG per figure 
+#   (outputPath + '-fig<N>.png'). The thread is returned, so the caller can join() it when the 
+#   files are needed. 
+# Before drawing, each series is reduced by downsampleForPlot to at most 2*maxPlotPoints points: 
+#   the grid is cut into maxPlotPoints consecutive blocks, and only the minimum and the maximum of 
+#   each block are kept, which preserves the visible envelope of the curve. 
+# Headless mode is chosen by headless=True, by the CVM_HEADLESS environment variable, or, by 
+#   default, whenever there is no display to draw on. 
+#
+####################################################################################################
+####################################################################################################
+
+EQUILIBRIUM_FIGURES = (
+    (1, 'Negative x- (blue), y- (green) and z-entropies (maroon)', (('negX', 'b'), ('negY', 'g'), ('negZ', 'm'))), 
+    (2, 'Negative YW (cyan), XZ (yellow) and total entropies (black)', (('negYW', 'c'), ('negXZ', 'y'), ('negTot', 'k'))), 
+    (3, 'Negative x-entropy (blue) and total entropy (black)', (('negX', 'b'), ('negTot', 'k'))), 
+    (4, 'Negative x-entropy (blue)', (('negX', 'b'),)), 
+    (5, 'Epsilon0 = %.2f, epsilon1 = %.2f: negative x-entropy (blue), activation (maroon) and '
+        'interaction enthalpy (green), free energy (black)', 
+        (('negX', 'b'), ('activEnthalpy', 'm'), ('interactEnthalpy', 'g'), ('freeEnergy', 'k'))), 
+)
+
+DEFAULT_MAX_PLOT_POINTS = 2000
+
+
+def headlessDisplayDefault ():
+    if 'CVM_HEADLESS' in os.environ:
+        return (os.environ['CVM_HEADLESS'].lower() not in ('', '0', 'false', 'no'))
+    if sys.platform.startswith('linux'):
+        return (not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')))
+    return (False)
+
+
+def downsampleForPlot (xArray, yArray, maxPlotPoints=DEFAULT_MAX_PLOT_POINTS):
+
+    xArray = np.asarray(xArray)
+    yArray = np.asarray(yArray)
+    nPoints = len(xArray)
+    if nPoints <= 2*maxPlotPoints:
+        return (xArray, yArray)
+
+    blockSize = -(-nPoints // maxPlotPoints)
+    nBlocks = -(-nPoints // blockSize)
+    padded = np.empty(nBlocks * blockSize, dtype=yArray.dtype)
+    padded[:nPoints] = yArray
+    padded[nPoints:] = yArray[-1]
+    blocks = padded.reshape(nBlocks, blockSize)
+    offsets = np.arange(nBlocks) * blockSize
+    keep = np.concatenate([offsets + np.argmin(blocks, axis=1), offsets + np.argmax(blocks, axis=1)])
+    keep = np.unique(np.minimum(keep, nPoints - 1))
+    return (xArray[keep], yArray[keep])
+
 
-####################################################################################################
-####################################################################################################
-#
-# Function to create the free energy of a simplle Ising system. 
-#
-####################################################################################################
-####################################################################################################
-    
-def computeEpsilonValues(xArray, epsilonComputedArray, xTotalSteps, xStep, xIncr):
-    
-    for j in range (0,xTotalSteps, xStep):
-        x = xArray[j]
-        epsilonComputed = -( log(x)-log(1.0-x))
-        epsilonComputedArray[j] = epsilonComputed
-    return (epsilonComputedArray)      
+def _renderEquilibriumFigures (xArray, columns, eps0, eps1, outputPath, maxPlotPoints, formats):
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    pdf = PdfPages(outputPath + '.pdf') if 'pdf' in formats else None
+    try:
+        for number, title, series in EQUILIBRIUM_FIGURES:
+            figure = Figure(figsize=(8, 6))
+            FigureCanvasAgg(figure)
+            axes = figure.add_subplot(1, 1, 1)
+            for name, color in series:
+                xPlot, yPlot = downsampleForPlot(xArray, columns[name], maxPlotPoints)
+                axes.plot(xPlot, yPlot, color, label=name)
+            axes.set_title(title % (eps0, eps1) if '%' in title else title, fontsize=9)
+            axes.set_xlabel('x')
+            axes.legend(fontsize=8)
+            if pdf is not None:
+                pdf.savefig(figure)
+            if 'png' in formats:
+                figure.savefig('%s-fig%d.png' % (outputPath, number))
+    finally:
+        if pdf is not None:
+            pdf.close()
 
 
+def renderEquilibriumFigures (xArray, columns, eps0, eps1, outputPath='cvm-equilibrium', 
+                              maxPlotPoints=DEFAULT_MAX_PLOT_POINTS, formats=('pdf', 'png')):
+    renderThread = threading.Thread(target=_renderEquilibriumFigures, name='cvm-render', 
+                                    args=(xArray, columns, eps0, eps1, outputPath, maxPlotPoints, formats))
+    renderThread.start()
+    return (renderThread)
+
 
 ####################################################################################################
 ####################################################################################################
@@ -310,9 +440,9 @@ def plotAndPrintEpsilonResults (xArray, epsilonComputedArray, xTotalSteps, xStep
     print ()  
     print ('    x   epsilon0    activEnthalpy' )               
     print ()         
-    for k in range (0, xTotalSteps, xStep):
-        activEnthalpy = epsilonComputedArray[k]*xArray[k]
-        print ('   %.2f' % (xArray[k]), '    %.4f' % (epsilonComputedArray[k]), '    %.4f' %  (activEnthalpy)  )        
+    sel = cvm_core.gridSlice(xTotalSteps, xStep)
+    activEnthalpy = epsilonComputedArray[sel]*xArray[sel]
+    print (formatTableRows('   %.2f     %.4f     %.4f', [xArray[sel], epsilonComputedArray[sel], activEnthalpy]), end='')
     print ()
 
 
@@ -323,37 +453,74 @@ def plotAndPrintEpsilonResults (xArray, epsilonComputedArray, xTotalSteps, xStep
 #
 # Procedure to print the results of equilibrium thermodynamic values when the interaction enthalpy = 0. 
 #
+# The headings come from `labels` (EQUILIBRIUM_PRINT_LABELS by default). The interacting (--h) 
+#   table is printed with interactingPrintLabels(h): its freeEnergy is 
+#   activEnthalpy + interactEnthalpy + negTot rather than the Simple Ising 
+#   activEnthalpy + interactEnthalpy + negX, so that table shows negTot as its entropy column. 
+#
 ####################################################################################################
 ####################################################################################################
 
+EQUILIBRIUM_PRINT_LABELS = {
+    'entropyTitle': ' Equilibrium results, where the interaction enthalpy = 0;', 
+    'freeEnergyTitle': ' The Simple Ising model;', 
+    'freeEnergyHeader': '    x   Entropy  activEnthalpy  interactEnthalpy   freeEnergy', 
+    'freeEnergyEntropy': 'negX', 
+    'interactionNote': '  Note that the interaction energy is the NEGATIVE of epsilon1*x*x.  ', 
+}
+
+
+def interactingPrintLabels (h):
+    labels = dict(EQUILIBRIUM_PRINT_LABELS)
+    labels['entropyTitle'] = ' Equilibrium results for the interacting CVM, h = %.4f (epsilon1 = %.4f);' % (h, cvm_core.epsilonFromH(h))
+    labels['freeEnergyTitle'] = ' The CVM free energy, freeEnergy = activEnthalpy + interactEnthalpy + negTotEntropy;'
+    labels['freeEnergyHeader'] = '    x   negTotEnt  activEnthalpy  interactEnthalpy   freeEnergy'
+    labels['freeEnergyEntropy'] = 'negTot'
+    labels['interactionNote'] = '  Note that the interaction energy is 0.5*epsilon1*(2*y2 - y1 - y3).  '
+    return (labels)
+
 
 def plotAndPrintEqulibriumResults (xArray, negXEnt, negYEnt, negZEnt, 
-                               negYWEnt, negXZEnt, negTotEnt, activEnthalpy, interactEnthalpy, freeEnergy, eps0, eps1, xTotalSteps, xStep):
+                               negYWEnt, negXZEnt, negTotEnt, activEnthalpy, interactEnthalpy, freeEnergy, eps0, eps1, xTotalSteps, xStep, 
+                               headless=None, outputPath='cvm-equilibrium', maxPlotPoints=DEFAULT_MAX_PLOT_POINTS, 
+                               labels=EQUILIBRIUM_PRINT_LABELS):
 
 
 
     #  CVM 2-D Entrop terms           
     print () 
-    print (' Equilibrium results, where the interaction enthalpy = 0;')
+    print (labels['entropyTitle'])
     print ()  
     print ('    x   negXEntropy negYEntropy negZEntropy negYWEntropy negXZEntropy negTotEnt' )               
     print ()         
-    for k in range (0, xTotalSteps, xStep):
-        print ('   %.2f' % (xArray[k]), '    %.2f' % (negXEnt[k]), '     %.2f' % (negYEnt[k]), '     %.2f' % (negZEnt[k]),  '      %.2f' % (negYWEnt[k]), '      %.2f' % (negXZEnt[k]), '      %.4f' % (negTotEnt[k]) )        
+    sel = cvm_core.gridSlice(xTotalSteps, xStep)
+    print (formatTableRows('   %.2f     %.2f      %.2f      %.2f       %.2f       %.2f       %.4f', 
+                           [xArray[sel], negXEnt[sel], negYEnt[sel], negZEnt[sel], negYWEnt[sel], negXZEnt[sel], negTotEnt[sel]]), end='')
     print ()
 
     #  Simple Ising model free energy and other thermodynamic terms              
+    freeEnergyEntropy = negTotEnt if labels['freeEnergyEntropy'] == 'negTot' else negXEnt
     print () 
-    print (' The Simple Ising model;')
+    print (labels['freeEnergyTitle'])
     print ()  
-    print ('    x   Entropy  activEnthalpy  interactEnthalpy   freeEnergy' )               
+    print (labels['freeEnergyHeader'])               
     print ()         
-    for k in range (0, xTotalSteps, xStep):
-        print ('   %.2f' % (xArray[k]), '    %.4f' % (negXEnt[k]), '     %.4f' % (activEnthalpy[k]), '       %.4f' % (interactEnthalpy[k]),  '       %.4f' % (freeEnergy[k]) )        
+    print (formatTableRows('   %.2f     %.4f      %.4f        %.4f        %.4f', 
+                           [xArray[sel], freeEnergyEntropy[sel], activEnthalpy[sel], interactEnthalpy[sel], freeEnergy[sel]]), end='')
     print ()
 
 
+    if headless is None:
+        headless = headlessDisplayDefault()
+    if headless:
+        columns = {'negX': negXEnt, 'negY': negYEnt, 'negZ': negZEnt, 'negYW': negYWEnt, 'negXZ': negXZEnt, 
+                   'negTot': negTotEnt, 'activEnthalpy': activEnthalpy, 'interactEnthalpy': interactEnthalpy, 
+                   'freeEnergy': freeEnergy}
+        print ('  Rendering the figures to %s.pdf and %s-fig<N>.png' % (outputPath, outputPath))
+        print ()
+        return (renderEquilibriumFigures(xArray, columns, eps0, eps1, outputPath, maxPlotPoints))
                                                                       
+    import pylab
     pylab.figure(1)
     pylab.plot (xArray, negXEnt)          
     pylab.plot (xArray, negYEnt, 'g')
@@ -408,7 +575,7 @@ def plotAndPrintEqulibriumResults (xArray, negXEnt, negYEnt, negZEnt,
     print ()  
     print () 
     print ('  Epsilon0 is   %.2f' % eps0, ' and epsilon1 is  %.2f' % eps1 )    
-    print ('  Note that the interaction energy is the NEGATIVE of epsilon1*x*x.  ' )
+    print (labels['interactionNote'])
     print ('  The negative xEntropyArray is in blue,' )
     print ('  The activation enthalpy array is in maroon,'  )    
     print ('  The interaction enthalpy array is in green,'  )
@@ -417,11 +584,347 @@ def plotAndPrintEqulibriumResults (xArray, negXEnt, negYEnt, negZEnt,
     pylab.show()  
 
       
+####################################################################################################
+####################################################################################################
+#
+# Procedure to print and plot a ThermoResults container (the column views are passed on, not copied). 
+#
 ####################################################################################################
 ####################################################################################################
 
+def plotAndPrintThermoResults (results, eps0, eps1, headless=None, outputPath='cvm-equilibrium', 
+                               maxPlotPoints=DEFAULT_MAX_PLOT_POINTS, labels=EQUILIBRIUM_PRINT_LABELS):
+    return (plotAndPrintEqulibriumResults(results['x'], results['negX'], results['negY'], results['negZ'], 
+                results['negYW'], results['negXZ'], results['negTot'], results['activEnthalpy'], 
+                results['interactEnthalpy'], results['freeEnergy'], eps0, eps1, len(results), 1, 
+                headless=headless, outputPath=outputPath, maxPlotPoints=maxPlotPoints, labels=labels))
 
-def main():
+
+####################################################################################################
+####################################################################################################
+#
+# Benchmark suite for every stage of the pipeline. 
+#
+# benchmarkPipeline times each stage - createXValues, every create*Values entropy and enthalpy 
+#   function, createSimpleIsingValues, computeEpsilonValues, the fused computeThermoTable, and 
+#   the printing and (headless) plotting stages - for each grid size in gridSizes. 
+#   For every stage and size it reports the best wall time of `repeat` runs, the throughput in 
+#   points per second, and the peak memory allocated during one run (measured with tracemalloc, 
+#   in a separate run so that tracing does not distort the timings). 
+# The original scalar loops (the *Loop reference functions) are timed too, as '<stage>Loop', 
+#   for sizes up to loopLimit, so every optimization can be measured against them; printing and 
+#   plotting are only timed up to outputLimit points. 
+# With saveBaseline=True the results are written to baselinePath as JSON; otherwise, if 
+#   baselinePath exists, each timing is compared with it and any stage more than 
+#   regressionTolerance slower is reported as a regression (and returned). Stages faster than 
+#   minSeconds are shown but never flagged, since their timings are dominated by noise. 
+# The default sizes (BENCHMARK_GRID_SIZES) run in seconds; BENCHMARK_FULL_GRID_SIZES (--benchmark 
+#   --full) adds 10^7 and 10^8 points, which needs about 15 GB of memory at 10^8 (the stage 
+#   columns plus the fused table). 
+#
+####################################################################################################
+####################################################################################################
+
+BENCHMARK_GRID_SIZES = (99, 10**4, 10**6)
+
+BENCHMARK_FULL_GRID_SIZES = (99, 10**4, 10**6, 10**7, 10**8)
+
+
+def _benchmarkStages (nPoints, loopLimit, outputLimit, scratchDir):
+
+    xIncr = 1.0/(nPoints + 1)
+    x = cvm_core.createXValues(np.zeros(nPoints), nPoints, 1, xIncr)
+    columns = {name: np.zeros(nPoints) for name in ('negX', 'negY', 'negZ', 'negW', 'negYW', 'negXZ', 'activEnthalpy', 'interactEnthalpy')}
+    cvm_core.createNegXEntropyValues(x, columns['negX'], nPoints, 1, xIncr)
+    cvm_core.createNegYEntropyValues(x, columns['negY'], nPoints, 1, xIncr)
+    cvm_core.createNegZEntropyValues(x, columns['negZ'], nPoints, 1, xIncr)
+    cvm_core.createNegWEntropyValues(x, columns['negW'], nPoints, 1, xIncr)
+    cvm_core.createNegYWEntropyValues(x, columns['negY'], columns['negYW'], nPoints, 1, xIncr, columns['negW'])
+    cvm_core.createNegXZEntropyValues(x, columns['negX'], columns['negZ'], columns['negXZ'], nPoints, 1, xIncr)
+    cvm_core.createActivationEnthalpyValues(x, columns['activEnthalpy'], 1.0, nPoints, 1, xIncr)
+    cvm_core.createInteractEnthalpyValues(x, columns['interactEnthalpy'], 0.5, nPoints, 1, xIncr)
+    out = np.zeros(nPoints)
+
+    stages = collections.OrderedDict()
+    for suffix in ('', 'Loop'):
+        if suffix == 'Loop' and nPoints > loopLimit:
+            continue
+        get = lambda name: getattr(cvm_core, name + suffix)
+        stages['createXValues' + suffix] = (lambda f=get('createXValues'): f(out, nPoints, 1, xIncr))
+        stages['createNegXEntropyValues' + suffix] = (lambda f=get('createNegXEntropyValues'): f(x, out, nPoints, 1, xIncr))
+        stages['createNegYEntropyValues' + suffix] = (lambda f=get('createNegYEntropyValues'): f(x, out, nPoints, 1, xIncr))
+        stages['createNegZEntropyValues' + suffix] = (lambda f=get('createNegZEntropyValues'): f(x, out, nPoints, 1, xIncr))
+        stages['createNegYWEntropyValues' + suffix] = (lambda f=get('createNegYWEntropyValues'): f(x, columns['negY'], out, nPoints, 1, xIncr, columns['negW']))
+        stages['createNegXZEntropyValues' + suffix] = (lambda f=get('createNegXZEntropyValues'): f(x, columns['negX'], columns['negZ'], out, nPoints, 1, xIncr))
+        stages['createNegTotEntropyValues' + suffix] = (lambda f=get('createNegTotEntropyValues'): f(x, columns['negYW'], columns['negXZ'], out, nPoints, 1, xIncr))
+        stages['createActivationEnthalpyValues' + suffix] = (lambda f=get('createActivationEnthalpyValues'): f(x, out, 1.0, nPoints, 1, xIncr))
+        stages['createInteractEnthalpyValues' + suffix] = (lambda f=get('createInteractEnthalpyValues'): f(x, out, 0.5, nPoints, 1, xIncr))
+        stages['createSimpleIsingValues' + suffix] = (lambda f=get('createSimpleIsingValues'): 
+                                                      f(columns['activEnthalpy'], columns['interactEnthalpy'], columns['negX'], out, nPoints, 1, xIncr))
+        stages['computeEpsilonValues' + suffix] = (lambda f=get('computeEpsilonValues'): f(x, out, nPoints, 1, xIncr))
+    stages['createNegWEntropyValues'] = lambda: cvm_core.createNegWEntropyValues(x, out, nPoints, 1, xIncr)
+
+    thermoTable = cvm_core.createThermoTable(nPoints)
+    stages['computeThermoTable'] = lambda: cvm_core.computeThermoTable(x, 1.0, 0.5, thermoTable)
+    stages['computeThermoTableAnalytic'] = lambda: cvm_core.computeThermoTable(x, 1.0, 0.5, thermoTable, mode='analytic')
+
+    if nPoints <= outputLimit:
+        def printStage ():
+            with contextlib.redirect_stdout(io.StringIO()):
+                plotAndPrintEpsilonResults(x, thermoTable['epsilon0'], nPoints, 1)
+                plotAndPrintEqulibriumResults(x, thermoTable['negX'], thermoTable['negY'], thermoTable['negZ'], 
+                    thermoTable['negYW'], thermoTable['negXZ'], thermoTable['negTot'], thermoTable['activEnthalpy'], 
+                    thermoTable['interactEnthalpy'], thermoTable['freeEnergy'], 1.0, 0.5, nPoints, 1, headless=True, 
+                    outputPath=os.path.join(scratchDir, 'print')).join()
+        stages['printAndPlot'] = printStage
+        columnDict = {name: thermoTable[name] for name in cvm_core.THERMO_COLUMNS}
+        stages['renderFigures'] = lambda: renderEquilibriumFigures(x, columnDict, 1.0, 0.5, os.path.join(scratchDir, 'render'), formats=('png',)).join()
+
+    return (stages)
+
+
+def benchmarkPipeline (gridSizes=BENCHMARK_GRID_SIZES, repeat=3, baselinePath='cvm-benchmark-baseline.json', 
+                       saveBaseline=False, regressionTolerance=0.25, minSeconds=1.0e-3, loopLimit=10**5, outputLimit=10**5):
+
+    results = collections.OrderedDict()
+    scratchDir = tempfile.mkdtemp(prefix='cvm-benchmark-')
+    try:
+        for nPoints in gridSizes:
+            stages = _benchmarkStages(nPoints, loopLimit, outputLimit, scratchDir)
+            results[str(nPoints)] = collections.OrderedDict()
+            for name, stage in stages.items():
+                best = cvm_core.bestTime(stage, repeat)
+                tracemalloc.start()
+                stage()
+                peakBytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results[str(nPoints)][name] = {'seconds': best, 'pointsPerSecond': nPoints / best, 'peakBytes': peakBytes}
+    finally:
+        shutil.rmtree(scratchDir, ignore_errors=True)
+
+    baseline = None
+    if not saveBaseline and baselinePath and os.path.exists(baselinePath):
+        with open(baselinePath) as baselineFile:
+            baseline = json.load(baselineFile)
+
+    regressions = []
+    print ()
+    print (' Pipeline benchmark (best of %d runs)' % repeat)
+    for size, stageResults in results.items():
+        print ()
+        print ('   %s points' % size)
+        print ('     stage                                 seconds     points/s    peak MB   vs. baseline')
+        for name, r in stageResults.items():
+            flag = ''
+            if baseline is not None and name in baseline.get(size, {}):
+                ratio = r['seconds'] / baseline[size][name]['seconds']
+                flag = '%6.2fx' % ratio
+                if ratio > 1.0 + regressionTolerance and r['seconds'] >= minSeconds:
+                    flag += '  REGRESSION'
+                    regressions.append((size, name, ratio))
+            print ('     %-36s' % name, '%10.3e' % r['seconds'], '  %10.3e' % r['pointsPerSecond'], 
+                   '  %8.2f' % (r['peakBytes'] / 2.0**20), '  %s' % flag)
+    print ()
+
+    if saveBaseline and baselinePath:
+        with open(baselinePath, 'w') as baselineFile:
+            json.dump(results, baselineFile, indent=1)
+        print (' Baseline saved to %s' % baselinePath)
+        print ()
+    elif regressions:
+        print (' %d stage(s) slower than the baseline by more than %d%%.' % (len(regressions), 100*regressionTolerance))
+        print ()
+
+    return (results, regressions)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Per-stage instrumentation. 
+#
+# When tracing is on - the CVM_TRACE environment variable names the output file, or main() is 
+#   given --trace <file> - instrumentStages replaces each pipeline stage listed in TRACED_STAGES 
+#   (the create*Values functions, computeThermoTable, the cache, sweep, solver, export, printing 
+#   and plotting stages) with a wrapper that records, for every call: 
+#     wall time, CPU time (process_time), the array bytes touched (the nbytes of every ndarray 
+#     argument and result), and - with CVM_TRACE_ALLOCATIONS=1 or --trace-allocations - the 
+#     bytes allocated and the peak allocation during the call (via tracemalloc, which is slow). 
+# The records are written as a Chrome trace-event JSON file (load it in chrome://tracing or 
+#   Perfetto); nested stages show up nested. The file is written by writeStageTrace, which is 
+#   called at exit. Calls made inside sweep worker processes are not recorded. 
+# With tracing off nothing is wrapped, so the stages cost exactly what they did before. 
+#
+####################################################################################################
+####################################################################################################
+
+TRACED_STAGES = ('createXValues', 'createNegXEntropyValues', 'createNegYEntropyValues', 'createNegZEntropyValues', 
+                 'createNegYWEntropyValues', 'createNegXZEntropyValues', 'createNegTotEntropyValues', 
+                 'createActivationEnthalpyValues', 'createInteractEnthalpyValues', 'createSimpleIsingValues', 
+                 'computeEpsilonValues', 'computeThermoTable', 'computeThermoTableCached', 'getEntropyColumns', 
+                 'openEntropyStore', 'streamThermoTable', 'sweepFreeEnergy', 'solveXFromEpsilon', 'findEquilibriumX', 
+                 'exportThermoTable', 'plotAndPrintEpsilonResults', 'plotAndPrintEqulibriumResults', 'renderEquilibriumFigures')
+
+_traceConfig = {'path': os.environ.get('CVM_TRACE'), 
+                'trackAllocations': os.environ.get('CVM_TRACE_ALLOCATIONS', '') not in ('', '0'), 
+                'events': [], 'atexitRegistered': False}
+
+
+def _arrayBytes (values):
+    return (sum(value.nbytes for value in values if isinstance(value, np.ndarray)))
+
+
+def tracedStage (name, func):
+
+    def stageWrapper (*args, **kwargs):
+        trackAllocations = _traceConfig['trackAllocations']
+        if trackAllocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            allocatedBefore = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wallStart = time.perf_counter()
+        cpuStart = time.process_time()
+        result = func(*args, **kwargs)
+        cpuSeconds = time.process_time() - cpuStart
+        wallSeconds = time.perf_counter() - wallStart
+
+        details = {'cpuSeconds': cpuSeconds, 
+                   'arrayBytes': _arrayBytes(list(args) + list(kwargs.values()) + [result])}
+        if trackAllocations:
+            allocatedAfter, peak = tracemalloc.get_traced_memory()
+            details['allocatedBytes'] = allocatedAfter - allocatedBefore
+            details['peakAllocatedBytes'] = peak - allocatedBefore
+        _traceConfig['events'].append({'name': name, 'cat': 'stage', 'ph': 'X', 
+                                       'ts': 1.0e6*wallStart, 'dur': 1.0e6*wallSeconds, 
+                                       'pid': os.getpid(), 'tid': threading.get_ident(), 'args': details})
+        return (result)
+
+    stageWrapper.__name__ = func.__name__
+    stageWrapper.__wrapped__ = func
+    return (stageWrapper)
+
+
+def instrumentStages (namespace=None, stageNames=TRACED_STAGES):
+    # by default each stage is wrapped where it is defined (cvm_core, or this program), which is 
+    #   where every caller looks it up, so the calls made inside the core are recorded too
+    for name in stageNames:
+        owner = namespace if namespace is not None else (vars(cvm_core) if hasattr(cvm_core, name) else globals())
+        if name in owner and not hasattr(owner[name], '__wrapped__'):
+            owner[name] = tracedStage(name, owner[name])
+
+
+def writeStageTrace (path=None):
+    path = path or _traceConfig['path']
+    if not path:
+        return (None)
+    with open(path, 'w') as traceFile:
+        json.dump({'traceEvents': _traceConfig['events'], 'displayTimeUnit': 'ms'}, traceFile)
+    return (path)
+
+
+def enableStageTracing (path, trackAllocations=None):
+    _traceConfig['path'] = path
+    if trackAllocations is not None:
+        _traceConfig['trackAllocations'] = trackAllocations
+    instrumentStages()
+    if not _traceConfig['atexitRegistered']:
+        atexit.register(writeStageTrace)
+        _traceConfig['atexitRegistered'] = True
+
+
+####################################################################################################
+####################################################################################################
+#
+# Command-line options. 
+# With no options, main() runs the original 99-point equilibrium calculation and printout. 
+#   --sweep runs sweepFreeEnergy over a grid of (eps0, eps1) values instead; each of --eps0 and 
+#   --eps1 is either a comma-separated list ("0,0.5,1") or start:stop:num ("-2:2:401"). 
+#   --benchmark-sweep times the parallel sweep for increasing numbers of workers. 
+#   --benchmark times every stage of the pipeline (see benchmarkPipeline). 
+#   --trace <file> records per-stage timings as a Chrome trace (see instrumentStages). 
+#
+####################################################################################################
+####################################################################################################
+
+def parseParameterList (text):
+    if ':' in text:
+        start, stop, num = text.split(':')
+        return (np.linspace(float(start), float(stop), int(num)))
+    return (np.array([float(value) for value in text.split(',')]))
+
+
+def parseCommandLine (argv=None):
+    parser = argparse.ArgumentParser(description='2-D Cluster Variation Method, no-interaction equilibrium calculations.')
+    parser.add_argument('--sweep', action='store_true', help='run a parallel (eps0, eps1) free-energy sweep')
+    parser.add_argument('--eps0', type=parseParameterList, default=parseParameterList('1.0'), help='eps0 values for --sweep')
+    parser.add_argument('--eps1', type=parseParameterList, default=parseParameterList('0.0'), help='eps1 values for --sweep')
+    parser.add_argument('--h', type=float, default=None, help='CVM interaction parameter h = exp(eps1/4); solves for the interacting distributions')
+    parser.add_argument('--steps', type=int, default=None, help='number of x grid points (default 99; 100000 for --benchmark-sweep)')
+    parser.add_argument('--incr', type=float, default=None, help='x grid increment (default 1/(steps+1))')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all cores)')
+    parser.add_argument('--headless', action='store_true', default=None, help='render the figures to files instead of showing them')
+    parser.add_argument('--plot-output', default='cvm-equilibrium', help='file name prefix for the headless figures')
+    parser.add_argument('--precision', choices=tuple(cvm_core.PRECISION_MODES), default=None, help='float64, float32 or mixed (default: $CVM_PRECISION or float64)')
+    parser.add_argument('--backend', choices=cvm_core.COMPUTE_BACKENDS, default=None, help='numeric backend (default: $CVM_BACKEND or numpy)')
+    parser.add_argument('--trace', default=None, help='write a per-stage Chrome trace (JSON) to this file')
+    parser.add_argument('--trace-allocations', action='store_true', default=None, help='also record tracemalloc allocations in the trace')
+    parser.add_argument('--benchmark', action='store_true', help='time every stage of the pipeline')
+    parser.add_argument('--sizes', type=lambda text: [int(float(size)) for size in text.split(',')], default=None, 
+                        help='comma-separated grid sizes for --benchmark, e.g. 99,1e4,1e6,1e8 (default 99,1e4,1e6)')
+    parser.add_argument('--full', action='store_true', help='run --benchmark on the full set of sizes, 99 up to 1e8 (about 15 GB at 1e8)')
+    parser.add_argument('--baseline', default='cvm-benchmark-baseline.json', help='benchmark baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='save the --benchmark results as the new baseline')
+    parser.add_argument('--benchmark-startup', action='store_true', help='check the import time of the numeric core against its budget')
+    parser.add_argument('--benchmark-sweep', action='store_true', help='time the parallel sweep against the worker count')
+    parser.add_argument('--benchmark-symmetry', action='store_true', help='time the x <-> 1-x symmetric evaluation against the full one')
+    return (parser.parse_args(argv))
+
+
+def runSweepFromCommandLine (args):
+    xTotalSteps = args.steps or 99
+    xIncr = args.incr if args.incr is not None else 1.0/(xTotalSteps + 1)
+    result = cvm_core.sweepFreeEnergy(args.eps0, args.eps1, xTotalSteps, xIncr, nWorkers=args.workers)
+    print ()
+    print (' Free-energy sweep over %d (eps0, eps1) pairs, %d grid points;' % (len(result['eps0']), xTotalSteps))
+    print ()
+    print ('    eps0      eps1     xAtMin    minFreeEnergy' )
+    print ()
+    for p in range(len(result['eps0'])):
+        print ('   %.4f' % result['eps0'][p], '   %.4f' % result['eps1'][p], '   %.4f' % result['xAtMin'][p], '    %.6f' % result['minFreeEnergy'][p])
+    print ()
+    return (result)
+
+
+####################################################################################################
+####################################################################################################
+
+
+def main(argv=None):
+
+    args = parseCommandLine(argv)
+    if args.backend:
+        cvm_core.setComputeBackend(args.backend)
+    if args.precision:
+        cvm_core.setPrecisionMode(args.precision)
+    if args.trace or _traceConfig['path']:
+        enableStageTracing(args.trace or _traceConfig['path'], args.trace_allocations)
+    if args.benchmark:
+        gridSizes = args.sizes or list(BENCHMARK_FULL_GRID_SIZES if args.full else BENCHMARK_GRID_SIZES)
+        benchmarkPipeline(gridSizes, baselinePath=args.baseline, saveBaseline=args.save_baseline)
+        return
+    if args.benchmark_startup:
+        benchmarkStartupTime()
+        return
+    if args.benchmark_sweep:
+        cvm_core.benchmarkSweepScaling(xTotalSteps=args.steps or 100000)
+        return
+    if args.benchmark_symmetry:
+        cvm_core.benchmarkSymmetricEntropy(nPoints=args.steps or 10**6)
+        return
+    if args.sweep:
+        runSweepFromCommandLine(args)
+        return
 
 ####################################################################################################
 # Obtain unit array size in terms of array_length (M) and layers (N)
@@ -440,41 +943,33 @@ def main():
     xStep = 1
     eps0 = 1.0
     eps1 = 0.0
-    xArray              =np.zeros(xTotalSteps, dtype=np.float)
-    negXEntropyArray    =np.zeros(xTotalSteps, dtype=np.float)
-    negYEntropyArray    =np.zeros(xTotalSteps, dtype=np.float)
-    negZEntropyArray    =np.zeros(xTotalSteps, dtype=np.float)   
-    negXZEntropyArray   =np.zeros(xTotalSteps, dtype=np.float)   
-    negYWEntropyArray   =np.zeros(xTotalSteps, dtype=np.float)   
-    negTotEntropyArray  =np.zeros(xTotalSteps, dtype=np.float) 
-    activEnthalpyArray  =np.zeros(xTotalSteps, dtype=np.float) 
-    epsilonComputedArray   =np.zeros(xTotalSteps, dtype=np.float)  
-    interactEnthalpyArray  =np.zeros(xTotalSteps, dtype=np.float)     
-    freeEnergyArray     =np.zeros(xTotalSteps, dtype=np.float)      
-    xArray              = createXValues(xArray, xTotalSteps, xStep, xIncr)
-    negXEntropyArray    = createNegXEntropyValues(xArray, negXEntropyArray, xTotalSteps, xStep, xIncr)
-    negYEntropyArray    = createNegYEntropyValues(xArray, negYEntropyArray, xTotalSteps, xStep, xIncr)
-    negZEntropyArray    = createNegZEntropyValues(xArray, negZEntropyArray, xTotalSteps, xStep, xIncr)    
-    negYWEntropyArray   = createNegYWEntropyValues(xArray, negYEntropyArray, negYWEntropyArray, xTotalSteps, xStep, xIncr)
-    negXZEntropyArray   = createNegXZEntropyValues(xArray, negXEntropyArray, negZEntropyArray, negXZEntropyArray, xTotalSteps, xStep, xIncr)
-    negTotEntropyArray  = createNegTotEntropyValues(xArray, negYWEntropyArray, negXZEntropyArray, negTotEntropyArray, xTotalSteps, xStep, xIncr) 
-    activEnthalpyArray   = createActivationEnthalpyValues(xArray, activEnthalpyArray, eps0, xTotalSteps, xStep, xIncr)
-    interactEnthalpyArray = createInteractEnthalpyValues(xArray, interactEnthalpyArray, eps1, xTotalSteps, xStep, xIncr)
-    freeEnergyArray     = createSimpleIsingValues(activEnthalpyArray, interactEnthalpyArray, negXEntropyArray, freeEnergyArray, xTotalSteps, xStep, xIncr)
-
-    epsilonComputedArray = computeEpsilonValues(xArray, epsilonComputedArray, xTotalSteps, xStep, xIncr)
+    xArray              = cvm_core.createXValues(np.zeros(xTotalSteps, dtype=np.float64), xTotalSteps, xStep, xIncr)
+    xArray              = xArray[cvm_core.gridSlice(xTotalSteps, xStep)]
+    nPoints             = len(xArray)
+    results             = cvm_core.createThermoResults(nPoints)
+    labels              = EQUILIBRIUM_PRINT_LABELS
+    if args.h is None:
+        cvm_core.computeThermoTable(xArray, eps0, eps1, results)
+    else:
+        eps1            = float(cvm_core.epsilonFromH(args.h))
+        labels          = interactingPrintLabels(args.h)
+        cvm_core.computeInteractingThermoTable(xArray, eps0, args.h, results)
       
-    plotAndPrintEpsilonResults (xArray, epsilonComputedArray, xTotalSteps, xStep)    
+    plotAndPrintEpsilonResults (results['x'], results['epsilon0'], nPoints, 1)    
 
-    plotAndPrintEqulibriumResults (xArray, negXEntropyArray, negYEntropyArray, negZEntropyArray, 
-                negYWEntropyArray, negXZEntropyArray, negTotEntropyArray, activEnthalpyArray, 
-                interactEnthalpyArray, freeEnergyArray, eps0, eps1, xTotalSteps, xStep)
+    renderThread = plotAndPrintThermoResults (results, eps0, eps1, headless=args.headless, outputPath=args.plot_output, 
+                                              labels=labels)
+    if renderThread is not None:
+        renderThread.join()
                                                                                                                     
                                                                                                 
 ####################################################################################################
 # Conclude specification of the MAIN procedure
 ####################################################################################################                
     
+# Tracing requested through the environment applies to library use as well as to main()
+if _traceConfig['path']: enableStageTracing(_traceConfig['path'])
+
 if __name__ == "__main__": main()
 
 ####################################################################################################
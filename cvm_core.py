@@ -0,0 +1,2682 @@
+# -*- coding: utf-8 -*-
+"""
+Numeric core of the 2-D Cluster Variation Method calculations. 
+
+Everything that computes - the vectorized engine, the fused kernel, the solvers, the caches, the 
+sweep and the JIT backend - lives here, and needs only NumPy and the standard library; 
+2D-CVM-simple-eq_no-interaction-calc_v3_2018-10-30.py imports it and adds the printing, plotting, 
+export, benchmark and command-line layer. The sweep worker processes load only this module. 
+"""
+
+import collections
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+from math import log
+from multiprocessing import shared_memory
+
+
+####################################################################################################
+####################################################################################################
+#
+# Vectorized engine. 
+#
+# Each vec* function takes an array of x-values (or previously computed columns) and returns the 
+#   corresponding column, computed with whole-array NumPy operations instead of a Python loop 
+#   that calls math.log once per grid point. 
+# The create*Values functions further below keep their original call signatures 
+#   (xArray, outArray, xTotalSteps, xStep, xIncr), and map those onto the vec* functions. 
+#
+# All of the log terms are endpoint-safe: xlogy(a, logB) follows the convention 0*log(0) = 0, 
+#   log(1-x) is taken as log1p(-x) (which is also more accurate for small x), and the divide/invalid 
+#   warnings of log(0) are silenced. An x of exactly 0 or 1 therefore gives the correct limiting 
+#   entropies (and epsilon0 = +inf or -inf) instead of stopping the sweep with a ValueError, 
+#   and no exception handling is needed inside the per-point work. 
+#
+####################################################################################################
+####################################################################################################
+
+# The grid points that the create*Values functions visit: j = 0, xStep, 2*xStep, ... < xTotalSteps
+
+def gridSlice (xTotalSteps, xStep):
+    return (slice(0, xTotalSteps, xStep))
+
+
+# np.cumsum accumulates sequentially, so this reproduces the repeated "newX = newX + xIncr" 
+#   of the original createXValues bit-for-bit (including its floating-point drift). 
+
+def vecXValues (nPoints, xIncr):
+    return (np.cumsum(np.full(nPoints, xIncr, dtype=np.float64)))
+
+
+def xlogy (a, logB):
+    return (np.where(a == 0, 0.0, a*logB))
+
+
+def xlogx (v):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (xlogy(v, np.log(v)))
+
+
+def vecNegXEntropy (x):
+    q = 1.0-x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (xlogy(x, np.log(x)) + xlogy(q, np.log1p(-x)))
+
+
+def vecNegYEntropy (x):
+    q = 1.0-x
+    y1 = x*x
+    y2 = x*q
+    y3 = q*q
+    return (xlogx(y1) + 2.*xlogx(y2) + xlogx(y3))
+
+
+def vecNegZEntropy (x):
+    q = 1.0-x
+    z1 = x*x*x
+    z2 = x*x*q
+    z3 = x*q*x
+    z4 = q*x*q
+    z5 = q*q*x
+    z6 = q*q*q
+    return (xlogx(z1) + 2.*xlogx(z2) + xlogx(z3) + xlogx(z4) + 2.*xlogx(z5) + xlogx(z6))
+
+
+def vecNegYWEntropy (negY, negW):
+    return (2*negY + negW)
+
+
+def vecNegXZEntropy (negX, negZ):
+    return (2*negZ + negX)
+
+
+def vecNegTotEntropy (negYW, negXZ):
+    return (-(negYW - negXZ))
+
+
+def vecActivationEnthalpy (x, eps0):
+    return (eps0*x)
+
+
+def vecInteractEnthalpy (x, eps1):
+    return (-eps1*x*x)
+
+
+def vecSimpleIsing (activEnthalpy, interactEnthalpy, negXEntropy):
+    return (activEnthalpy + interactEnthalpy + negXEntropy)
+
+
+def vecEpsilon (x):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (-(np.log(x) - np.log1p(-x)))
+
+    
+####################################################################################################
+####################################################################################################
+#
+# Configuration-variable engine. 
+#
+# The entropies are all built from the same configuration variables: 
+#   x1, x2             single units (A, B) 
+#   y1, y2, y3         nearest-neighbour pairs (AA, AB, BB), y2 with degeneracy 2 
+#   w1, w2, w3         next-nearest-neighbour pairs (A-A, A-B, B-B), w2 with degeneracy 2 
+#   z1, ..., z6        triplets (AAA, AAB, ABA, BAB, ABB, BBB), z2 and z5 with degeneracy 2 
+# computeConfigVariables stores all fourteen of them in one packed (14, nPoints) array, one 
+#   contiguous row per variable (in CONFIG_VARIABLES order), and configEntropyTerms takes 
+#   v*log(v) once per row and sums the rows of each group with their degeneracies: 
+#     negX = sum x_i log x_i,  negY = sum deg_i y_i log y_i,  negW = sum deg_i w_i log w_i,  negZ = ... 
+# So W is computed from its own distribution instead of being copied from Y. When only negW is 
+#   needed (vecNegWEntropy, createNegWEntropyValues), computeWVariables builds just the three w 
+#   rows rather than the whole packed array. 
+#
+# Without interaction every variable is a product of x and q = 1-x (and w_i happens to equal y_i). 
+#   For any other triplet distribution, configVariablesFromZ fills the packed array from z1..z6 
+#   through the CVM normalization relations: 
+#     y1 = z1 + z2,  y2 = z2 + z4 = z3 + z5,  y3 = z5 + z6 
+#     w1 = z1 + z3,  w2 = z2 + z5,  w3 = z4 + z6 
+#     x1 = y1 + y2,  x2 = y2 + y3 
+#
+####################################################################################################
+####################################################################################################
+
+CONFIG_VARIABLES = ('x1', 'x2', 'y1', 'y2', 'y3', 'w1', 'w2', 'w3', 
+                    'z1', 'z2', 'z3', 'z4', 'z5', 'z6')
+
+CONFIG_DEGENERACY = np.array([1., 1., 1., 2., 1., 1., 2., 1., 1., 2., 1., 1., 2., 1.])
+
+CONFIG_GROUPS = {'X': slice(0, 2), 'Y': slice(2, 5), 'W': slice(5, 8), 'Z': slice(8, 14)}
+
+
+def createConfigVariables (nPoints, dtype=np.float64):
+    return (np.zeros((len(CONFIG_VARIABLES), nPoints), dtype=dtype))
+
+
+def computeConfigVariables (xArray, configVars=None):
+
+    x = np.asarray(xArray, dtype=np.float64)
+    if configVars is None:
+        configVars = createConfigVariables(len(x))
+    q = 1.0-x
+    # the same products (and the same operation order) as vecNegYEntropy and vecNegZEntropy
+    configVars[0] = x
+    configVars[1] = q
+    configVars[2] = x*x
+    configVars[3] = x*q
+    configVars[4] = q*q
+    configVars[5:8] = configVars[2:5]
+    configVars[8] = x*x*x
+    configVars[9] = x*x*q
+    configVars[10] = x*q*x
+    configVars[11] = q*x*q
+    configVars[12] = q*q*x
+    configVars[13] = q*q*q
+    return (configVars)
+
+
+def configVariablesFromZ (zArray, configVars=None):
+
+    z1, z2, z3, z4, z5, z6 = zArray
+    if configVars is None:
+        configVars = createConfigVariables(len(z1), dtype=np.result_type(z1, np.float64))
+    configVars[8:14] = zArray
+    configVars[2] = z1 + z2
+    configVars[3] = z2 + z4
+    configVars[4] = z5 + z6
+    configVars[5] = z1 + z3
+    configVars[6] = z2 + z5
+    configVars[7] = z4 + z6
+    configVars[0] = configVars[2] + configVars[3]
+    configVars[1] = configVars[3] + configVars[4]
+    return (configVars)
+
+
+def computeWVariables (xArray):
+    # only the w rows of computeConfigVariables (w1 = x^2, w2 = x q, w3 = q^2), for the callers 
+    #   that need negW and nothing else
+    x = np.asarray(xArray, dtype=np.float64)
+    q = 1.0-x
+    return (np.stack((x*x, x*q, q*q)))
+
+
+def configGroupEntropy (groupVars, group):
+    # row by row, so the temporaries stay one row in size
+    weights = CONFIG_DEGENERACY[CONFIG_GROUPS[group]]
+    total = weights[0]*xlogx(groupVars[0])
+    for weight, row in zip(weights[1:], groupVars[1:]):
+        total += weight*xlogx(row)
+    return (total)
+
+
+def configEntropyTerms (configVars, groups=('X', 'Y', 'W', 'Z')):
+
+    terms = {}
+    for group in groups:
+        terms['neg' + group] = configGroupEntropy(configVars[CONFIG_GROUPS[group]], group)
+    return (terms)
+
+
+def vecNegWEntropy (x):
+    return (configGroupEntropy(computeWVariables(x), 'W'))
+
+    
+####################################################################################################
+####################################################################################################
+#
+# Function to create the x-values. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createXValues(xArray, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    nPoints = len(range(0, xTotalSteps, xStep))
+    xArray[sel] = vecXValues(nPoints, xIncr)
+    return (xArray)
+    
+####################################################################################################
+####################################################################################################
+#
+# Function to create the x-entrlpy. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegXEntropyValues(xArray, negXEntropyArray, xTotalSteps, xStep, xIncr, symmetric=False):
+    sel = gridSlice(xTotalSteps, xStep)
+    if symmetric:
+        negXEntropyArray[sel] = evaluateSymmetric(entropyStageFunction('negX', vecNegXEntropy), xArray[sel])
+    elif activeComputeBackend() == 'jit':
+        jitEntropyColumn(xArray[sel], 'negX', negXEntropyArray[sel])
+    else:
+        negXEntropyArray[sel] = vecNegXEntropy(xArray[sel])
+    return (negXEntropyArray)
+    
+     
+####################################################################################################
+####################################################################################################
+#
+# Function to create the y-entropy. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegYEntropyValues(xArray, negYEntropyArray, xTotalSteps, xStep, xIncr, symmetric=False):
+    sel = gridSlice(xTotalSteps, xStep)
+    if symmetric:
+        negYEntropyArray[sel] = evaluateSymmetric(entropyStageFunction('negY', vecNegYEntropy), xArray[sel])
+    elif activeComputeBackend() == 'jit':
+        jitEntropyColumn(xArray[sel], 'negY', negYEntropyArray[sel])
+    else:
+        negYEntropyArray[sel] = vecNegYEntropy(xArray[sel])
+    return (negYEntropyArray)
+    
+####################################################################################################
+####################################################################################################
+#
+# Function to create the z-entropy. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegZEntropyValues(xArray, negZEntropyArray, xTotalSteps, xStep, xIncr, symmetric=False):
+    sel = gridSlice(xTotalSteps, xStep)
+    if symmetric:
+        negZEntropyArray[sel] = evaluateSymmetric(entropyStageFunction('negZ', vecNegZEntropy), xArray[sel])
+    elif activeComputeBackend() == 'jit':
+        jitEntropyColumn(xArray[sel], 'negZ', negZEntropyArray[sel])
+    else:
+        negZEntropyArray[sel] = vecNegZEntropy(xArray[sel])
+    return (negZEntropyArray)
+    
+
+####################################################################################################
+####################################################################################################
+#
+# Function to create the w-entropy (next-nearest-neighbour pairs). 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegWEntropyValues(xArray, negWEntropyArray, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    negWEntropyArray[sel] = vecNegWEntropy(xArray[sel])
+    return (negWEntropyArray)
+    
+
+####################################################################################################
+####################################################################################################
+#
+# Function to create the numerator of the total entropy. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegYWEntropyValues(xArray, negYEntropyArray, negYWEntropyArray, xTotalSteps, xStep, xIncr, negWEntropyArray=None):
+    sel = gridSlice(xTotalSteps, xStep)
+    if negWEntropyArray is None:
+        negW = vecNegWEntropy(xArray[sel])
+    else:
+        negW = negWEntropyArray[sel]
+    negYWEntropyArray[sel] = vecNegYWEntropy(negYEntropyArray[sel], negW)
+    return (negYWEntropyArray)     
+
+
+
+####################################################################################################
+####################################################################################################
+#
+# Function to create the denominator of the total entropy. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegXZEntropyValues(xArray, negXEntropyArray, negZEntropyArray, negXZEntropyArray, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    negXZEntropyArray[sel] = vecNegXZEntropy(negXEntropyArray[sel], negZEntropyArray[sel])
+    return (negXZEntropyArray)     
+    
+
+####################################################################################################
+####################################################################################################
+#
+# Function to create the denominator of the total entropy. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createNegTotEntropyValues(xArray, negYWEntropyArray, negXZEntropyArray, negTotEntropyArray, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    negTotEntropyArray[sel] = vecNegTotEntropy(negYWEntropyArray[sel], negXZEntropyArray[sel])
+    return (negTotEntropyArray)     
+
+ 
+####################################################################################################
+####################################################################################################
+#
+# Function to create the activation enthalpy of a simplle Ising system. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createActivationEnthalpyValues(xArray, activEnthalpyArray, eps0, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    activEnthalpyArray[sel] = vecActivationEnthalpy(xArray[sel], eps0)
+    return (activEnthalpyArray)     
+
+ 
+####################################################################################################
+####################################################################################################
+#
+# Function to create the free energy of a simplle Ising system. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createInteractEnthalpyValues(xArray, interactEnthalpyArray, eps1, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    interactEnthalpyArray[sel] = vecInteractEnthalpy(xArray[sel], eps1)
+    return (interactEnthalpyArray)     
+ 
+    
+
+####################################################################################################
+####################################################################################################
+#
+# Function to create the free energy of a simplle Ising system. 
+#
+####################################################################################################
+####################################################################################################
+    
+def createSimpleIsingValues(activEnthalpyArray, interactEnthalpyArray, negXEntropyArray, freeEnergyArray, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    freeEnergyArray[sel] = vecSimpleIsing(activEnthalpyArray[sel], interactEnthalpyArray[sel], negXEntropyArray[sel])
+    return (freeEnergyArray)      
+
+####################################################################################################
+####################################################################################################
+#
+# Function to create the free energy of a simplle Ising system. 
+#
+####################################################################################################
+####################################################################################################
+    
+def computeEpsilonValues(xArray, epsilonComputedArray, xTotalSteps, xStep, xIncr):
+    sel = gridSlice(xTotalSteps, xStep)
+    epsilonComputedArray[sel] = vecEpsilon(xArray[sel])
+    return (epsilonComputedArray)      
+
+
+####################################################################################################
+####################################################################################################
+#
+# Fused single-pass kernel for the whole thermodynamic table. 
+#
+# Rather than eleven separate arrays and ten separate passes over xArray, computeThermoTable 
+#   takes log(x) and log(1-x) once per grid point, and builds every other log from those two: 
+#     log(y1) = 2 log(x),  log(y2) = log(x) + log(q),  log(z2) = 2 log(x) + log(q),  etc. 
+# The grid is walked in blocks of blockSize points, so the temporaries for a block stay in cache 
+#   and each output column is written exactly once; the working memory is O(blockSize), 
+#   independent of the grid size. 
+# The results are written into a caller-supplied structured array with the THERMO_DTYPE layout 
+#   (see createThermoTable). 
+#
+# With mode='analytic', the y- and z-sums are not evaluated term by term at all. 
+#   Under the no-interaction assumption every y_i and z_i is a product of x and q = 1-x, and the 
+#   weights (with degeneracies) sum to one, so collecting the x*log(x) and q*log(q) terms gives 
+#     negY = 2*(x log x + q log q) = 2*negX,   negZ = 3*(x log x + q log q) = 3*negX. 
+#   Only the two logs per point remain; verifyAnalyticEntropy checks this mode against the 
+#   term-by-term formulas. 
+# With mode='symmetric', only the points with x <= 0.5 (and those without an exact mirror 
+#   partner) go through the fused kernel, and the entropies of the rest are mirrored 
+#   (see computeSymmetricThermoTable). 
+#
+####################################################################################################
+####################################################################################################
+
+THERMO_COLUMNS = ('x', 'negX', 'negY', 'negZ', 'negYW', 'negXZ', 'negTot', 
+                  'activEnthalpy', 'interactEnthalpy', 'freeEnergy', 'epsilon0')
+
+THERMO_DTYPE = np.dtype([(name, np.float64) for name in THERMO_COLUMNS])
+
+
+def thermoDtype (storageDtype=np.float64):
+    return (np.dtype([(name, storageDtype) for name in THERMO_COLUMNS]))
+
+# 16384 points * ~10 float64 temporaries is ~1.3 MB, which sits comfortably in L2/L3 cache. 
+DEFAULT_BLOCK_SIZE = 16384
+
+THERMO_MODES = ('fused', 'analytic', 'symmetric')
+
+
+def createThermoTable (nPoints, dtype=None):
+    storageDtype = precisionDtypes()[1] if dtype is None else np.dtype(dtype)
+    return (np.zeros(nPoints, dtype=thermoDtype(storageDtype)))
+
+
+def computeThermoTable (xArray, eps0, eps1, thermoTable, blockSize=DEFAULT_BLOCK_SIZE, mode='fused'):
+
+    nPoints = len(xArray)
+    if mode not in THERMO_MODES:
+        raise ValueError('Unknown mode %r; expected one of %s.' % (mode, THERMO_MODES))
+    if thermoTable.dtype.names != THERMO_COLUMNS:
+        raise ValueError('thermoTable must have the THERMO_DTYPE layout; use createThermoTable().')
+    if len(thermoTable) != nPoints:
+        raise ValueError('thermoTable has %d rows, but xArray has %d points.' % (len(thermoTable), nPoints))
+    if mode == 'symmetric':
+        return (computeSymmetricThermoTable(xArray, eps0, eps1, thermoTable, blockSize))
+    computeDtype = precisionDtypes()[0]
+    if (np.ndim(eps0) == 0 and np.ndim(eps1) == 0 and computeDtype == np.float64 
+            and activeComputeBackend() == 'jit'):
+        return (jitThermoTable(xArray, eps0, eps1, thermoTable, analytic=(mode == 'analytic')))
+
+    # eps0 and eps1 may also be per-point arrays (as findEquilibriumX uses them)
+    eps0 = np.asarray(eps0, dtype=computeDtype)
+    eps1 = np.asarray(eps1, dtype=computeDtype)
+    # log(0) = -inf at the endpoints is expected; xlogy turns the 0*(-inf) terms into 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for lo in range(0, nPoints, blockSize):
+            hi = min(lo + blockSize, nPoints)
+            x = np.asarray(xArray[lo:hi], dtype=computeDtype)
+            eps0Block = eps0[lo:hi] if eps0.ndim else eps0
+            eps1Block = eps1[lo:hi] if eps1.ndim else eps1
+            q = 1.0 - x
+            logX = np.log(x)
+            logQ = np.log1p(-x)
+
+            xx = x*x
+            xq = x*q
+            qq = q*q
+            negX = xlogy(x, logX) + xlogy(q, logQ)
+            if mode == 'analytic':
+                negY = 2.*negX
+                negZ = 3.*negX
+                negW = 2.*negX
+            else:
+                # y1 = x^2, y2 = x q (counted twice), y3 = q^2; without interaction the w-pairs 
+                #   (w1 = z1 + z3, w2 = z2 + z5, w3 = z4 + z6) are the same products, so the pair 
+                #   terms are summed once for both negY and negW (configEntropyTerms evaluates W on 
+                #   its own where the two distributions differ)
+                pairTerms = xlogy(xx, 2.*logX) + 2.*xlogy(xq, logX + logQ) + xlogy(qq, 2.*logQ)
+                negY = pairTerms
+                negW = pairTerms
+                # z1 = x^3, z2 = z3 = x^2 q (z2 counted twice), z4 = z5 = x q^2 (z5 counted twice), z6 = q^3
+                negZ = (xlogy(x*xx, 3.*logX) + 3.*xlogy(xx*q, 2.*logX + logQ) 
+                        + 3.*xlogy(x*qq, logX + 2.*logQ) + xlogy(q*qq, 3.*logQ))
+            negYW = vecNegYWEntropy(negY, negW)
+            negXZ = vecNegXZEntropy(negX, negZ)
+            activEnthalpy = eps0Block*x
+            interactEnthalpy = -eps1Block*xx
+
+            block = thermoTable[lo:hi]
+            block['x'] = x
+            block['negX'] = negX
+            block['negY'] = negY
+            block['negZ'] = negZ
+            block['negYW'] = negYW
+            block['negXZ'] = negXZ
+            block['negTot'] = vecNegTotEntropy(negYW, negXZ)
+            block['activEnthalpy'] = activEnthalpy
+            block['interactEnthalpy'] = interactEnthalpy
+            block['freeEnergy'] = activEnthalpy + interactEnthalpy + negX
+            block['epsilon0'] = logQ - logX
+
+    return (thermoTable)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Compact, column-oriented result container. 
+#
+# A ThermoResults holds all of the THERMO_COLUMNS in ONE C-contiguous (nColumns, nPoints) buffer, 
+#   so each column is a contiguous row of it (a structured THERMO_DTYPE table interleaves the 
+#   columns instead, and its column views are strided). 
+#     results['negTot'], results.negTot     the column, as a view (no copy) 
+#     results[lo:hi]                        a ThermoResults view of those points 
+#     results[k]                            row k, as a THERMO_DTYPE-style record (a copy: the 
+#                                           values of one row are not adjacent in the buffer) 
+#     results['negTot'] = ...               writes in place 
+#   It has the same len(), dtype.names and slicing behaviour as a structured table, so 
+#   computeThermoTable, computeInteractingThermoTable, the streaming sinks and the exporters 
+#   fill or read it as they are; fillThermoResultsByStages runs the individual create*Values 
+#   stages into its columns, and plotAndPrintThermoResults prints and plots it. 
+# ThermoResults.fromBuffer wraps memory that is allocated elsewhere - a 
+#   multiprocessing.shared_memory block, an mmap, or np.memmap - of ThermoResults.bufferSize bytes, 
+#   so a whole result set can be handed to another process or to disk without a copy. 
+#
+####################################################################################################
+####################################################################################################
+
+class ThermoResults:
+
+    __slots__ = ('buffer', 'columns', '_index')
+
+    def __init__ (self, buffer, columns=THERMO_COLUMNS):
+        if buffer.ndim != 2 or buffer.shape[0] != len(columns):
+            raise ValueError('ThermoResults needs a (%d, nPoints) buffer, not %s.' % (len(columns), buffer.shape))
+        self.buffer = buffer
+        self.columns = tuple(columns)
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    @classmethod
+    def fromBuffer (cls, buffer, nPoints, dtype=np.float64, offset=0, columns=THERMO_COLUMNS):
+        return (cls(np.ndarray((len(columns), nPoints), dtype=dtype, buffer=buffer, offset=offset), columns))
+
+    @staticmethod
+    def bufferSize (nPoints, dtype=np.float64, columns=THERMO_COLUMNS):
+        return (len(columns)*nPoints*np.dtype(dtype).itemsize)
+
+    def __len__ (self):
+        return (self.buffer.shape[1])
+
+    @property
+    def dtype (self):
+        return (np.dtype([(name, self.buffer.dtype) for name in self.columns]))
+
+    def __getitem__ (self, key):
+        if isinstance(key, str):
+            return (self.buffer[self._index[key]])
+        if isinstance(key, (int, np.integer)):
+            return (np.array(tuple(self.buffer[:, key]), dtype=self.dtype)[()])
+        return (ThermoResults(self.buffer[:, key], self.columns))
+
+    def __setitem__ (self, key, value):
+        if isinstance(key, str):
+            self.buffer[self._index[key]] = value
+            return
+        for i, name in enumerate(self.columns):
+            self.buffer[i, key] = value[name]
+
+    def __getattr__ (self, name):
+        try:
+            return (self.buffer[object.__getattribute__(self, '_index')[name]])
+        except KeyError:
+            raise AttributeError(name)
+
+    def asDict (self):
+        return ({name: self.buffer[i] for i, name in enumerate(self.columns)})
+
+
+def createThermoResults (nPoints, dtype=None):
+    storageDtype = precisionDtypes()[1] if dtype is None else np.dtype(dtype)
+    return (ThermoResults(np.zeros((len(THERMO_COLUMNS), nPoints), dtype=storageDtype)))
+
+
+def fillThermoResultsByStages (results, eps0, eps1, xIncr=None):
+
+    # the stage-by-stage route of the original program, every stage writing into its own column; 
+    #   with xIncr the x column is (re)built by createXValues first
+    nPoints = len(results)
+    x = results['x']
+    if xIncr is not None:
+        createXValues(x, nPoints, 1, xIncr)
+    createNegXEntropyValues(x, results['negX'], nPoints, 1, xIncr)
+    createNegYEntropyValues(x, results['negY'], nPoints, 1, xIncr)
+    createNegZEntropyValues(x, results['negZ'], nPoints, 1, xIncr)
+    negW = createNegWEntropyValues(x, np.empty(nPoints, dtype=results.buffer.dtype), nPoints, 1, xIncr)
+    createNegYWEntropyValues(x, results['negY'], results['negYW'], nPoints, 1, xIncr, negW)
+    createNegXZEntropyValues(x, results['negX'], results['negZ'], results['negXZ'], nPoints, 1, xIncr)
+    createNegTotEntropyValues(x, results['negYW'], results['negXZ'], results['negTot'], nPoints, 1, xIncr)
+    createActivationEnthalpyValues(x, results['activEnthalpy'], eps0, nPoints, 1, xIncr)
+    createInteractEnthalpyValues(x, results['interactEnthalpy'], eps1, nPoints, 1, xIncr)
+    createSimpleIsingValues(results['activEnthalpy'], results['interactEnthalpy'], results['negX'], 
+                            results['freeEnergy'], nPoints, 1, xIncr)
+    computeEpsilonValues(x, results['epsilon0'], nPoints, 1, xIncr)
+    return (results)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Analytic derivatives of the entropy and free-energy columns. 
+#
+# Each entropy term is a weighted sum of v*log(v) over configuration variables v(x), so by the 
+#   chain rule 
+#     d/dx   [v log v] = v' (log v + 1) 
+#     d2/dx2 [v log v] = v'' (log v + 1) + v'^2 / v 
+#   and one log per variable gives the value, the slope and the curvature together. 
+#   computeConfigDerivatives returns v, v' and v'' for all fourteen variables (without interaction 
+#   every one is a polynomial in x), packed like computeConfigVariables; 
+#   configEntropyDerivatives sums them per group. 
+# computeThermoDerivatives walks the grid in blocks and returns, for each of DERIVATIVE_COLUMNS, 
+#   the value, the first derivative (name + 'Dx') and the second derivative (name + 'Dx2'), with 
+#     negTot     = negX + 2*negZ - 2*negY - negW 
+#     freeEnergy = eps0*x - eps1*x^2 + negX      (the createSimpleIsingValues free energy) 
+#   freeEnergyDx = 0 is the equilibrium condition that computeEpsilonValues solves by hand, and 
+#   freeEnergyDx2 = 0 is the spinodal. At x = 0 and x = 1 the derivatives are +-inf, as they 
+#   should be (0*log(0) terms and 0/0 curvatures take their limits). checkThermoDerivatives compares 
+#   everything with central finite differences. 
+#
+####################################################################################################
+####################################################################################################
+
+DERIVATIVE_COLUMNS = ('negX', 'negY', 'negZ', 'negTot', 'freeEnergy')
+
+
+def computeConfigDerivatives (xArray):
+
+    x = np.asarray(xArray, dtype=np.float64)
+    q = 1.0-x
+    configVars = computeConfigVariables(x)
+    dConfig = createConfigVariables(len(x))
+    d2Config = createConfigVariables(len(x))
+    # x1 = x, x2 = q; y1 = w1 = x^2, y2 = w2 = x q, y3 = w3 = q^2; 
+    # z1 = x^3, z2 = z3 = x^2 q, z4 = z5 = x q^2, z6 = q^3
+    dConfig[0] = 1.0
+    dConfig[1] = -1.0
+    dConfig[2] = 2.0*x
+    dConfig[3] = q - x
+    dConfig[4] = -2.0*q
+    dConfig[5:8] = dConfig[2:5]
+    dConfig[8] = 3.0*x*x
+    dConfig[9] = 2.0*x*q - x*x
+    dConfig[10] = dConfig[9]
+    dConfig[11] = q*q - 2.0*x*q
+    dConfig[12] = dConfig[11]
+    dConfig[13] = -3.0*q*q
+    d2Config[2] = 2.0
+    d2Config[3] = -2.0
+    d2Config[4] = 2.0
+    d2Config[5:8] = d2Config[2:5]
+    d2Config[8] = 6.0*x
+    d2Config[9] = 2.0*q - 4.0*x
+    d2Config[10] = d2Config[9]
+    d2Config[11] = 2.0*x - 4.0*q
+    d2Config[12] = d2Config[11]
+    d2Config[13] = 6.0*q
+    return (configVars, dConfig, d2Config)
+
+
+def configEntropyDerivatives (configVars, dConfig, d2Config, groups=('X', 'Y', 'W', 'Z')):
+
+    terms = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logPlusOne = np.log(configVars) + 1.0
+        # limits at v = 0: v' (log v + 1) -> 0 when v' = 0, and v'^2/v -> 0 when v' = 0
+        slope = xlogy(dConfig, logPlusOne)
+        curvature = xlogy(d2Config, logPlusOne) + np.where(dConfig == 0.0, 0.0, dConfig*dConfig/configVars)
+        vLogV = xlogy(configVars, logPlusOne - 1.0)
+        for group in groups:
+            rows = CONFIG_GROUPS[group]
+            weights = CONFIG_DEGENERACY[rows]
+            terms['neg' + group] = weights @ vLogV[rows]
+            terms['neg' + group + 'Dx'] = weights @ slope[rows]
+            terms['neg' + group + 'Dx2'] = weights @ curvature[rows]
+    return (terms)
+
+
+def computeThermoDerivatives (xArray, eps0=1.0, eps1=0.0, blockSize=DEFAULT_BLOCK_SIZE):
+
+    x = np.asarray(xArray, dtype=np.float64)
+    nPoints = len(x)
+    results = {}
+    for name in DERIVATIVE_COLUMNS:
+        for suffix in ('', 'Dx', 'Dx2'):
+            results[name + suffix] = np.empty(nPoints)
+    for lo in range(0, nPoints, blockSize):
+        hi = min(lo + blockSize, nPoints)
+        xBlock = x[lo:hi]
+        terms = configEntropyDerivatives(*computeConfigDerivatives(xBlock))
+        with np.errstate(invalid='ignore'):
+            for suffix in ('', 'Dx', 'Dx2'):
+                negTot = np.zeros(hi - lo)
+                for group, weight in ENTROPY_GROUP_WEIGHTS.items():
+                    negTot = negTot + weight*terms['neg' + group + suffix]
+                terms['negTot' + suffix] = negTot
+        # at x = 0 and x = 1 the infinite terms can cancel to NaN; every entropy column is then 
+        #   dominated by log(x) or log(q) terms: slope -inf / +inf, curvature +inf
+        edge = ~((xBlock > 0.0) & (xBlock < 1.0))
+        if edge.any():
+            for name in ('negX', 'negY', 'negZ', 'negTot'):
+                terms[name + 'Dx'][edge] = np.where(xBlock[edge] <= 0.0, -np.inf, np.inf)
+                terms[name + 'Dx2'][edge] = np.inf
+        for name in ('negX', 'negY', 'negZ', 'negTot'):
+            for suffix in ('', 'Dx', 'Dx2'):
+                results[name + suffix][lo:hi] = terms[name + suffix]
+        negX = terms['negX']
+        results['freeEnergy'][lo:hi] = eps0*xBlock - eps1*xBlock*xBlock + negX
+        results['freeEnergyDx'][lo:hi] = eps0 - 2.0*eps1*xBlock + terms['negXDx']
+        results['freeEnergyDx2'][lo:hi] = -2.0*eps1 + terms['negXDx2']
+    return (results)
+
+
+def checkThermoDerivatives (xArray=None, eps0=1.0, eps1=0.7, step=1.0e-5, printResults=True):
+
+    x = np.linspace(0.01, 0.99, 99) if xArray is None else np.asarray(xArray, dtype=np.float64)
+    results = computeThermoDerivatives(x, eps0, eps1)
+    above = computeThermoDerivatives(x + step, eps0, eps1)
+    below = computeThermoDerivatives(x - step, eps0, eps1)
+    maxError = {}
+    for name in DERIVATIVE_COLUMNS:
+        firstFD = (above[name] - below[name])/(2.0*step)
+        secondFD = (above[name] - 2.0*results[name] + below[name])/(step*step)
+        # relative to the size of the derivative, which reaches ~100 at x = 0.01
+        maxError[name + 'Dx'] = float(np.max(np.abs(results[name + 'Dx'] - firstFD)/np.maximum(1.0, np.abs(firstFD))))
+        maxError[name + 'Dx2'] = float(np.max(np.abs(results[name + 'Dx2'] - secondFD)/np.maximum(1.0, np.abs(secondFD))))
+
+    if printResults:
+        print ()
+        print (' Analytic derivatives vs. central finite differences (step %.0e), maximum relative difference:' % step)
+        print ()
+        for name in DERIVATIVE_COLUMNS:
+            print ('   %-12s' % name, '   d/dx %.2e' % maxError[name + 'Dx'], '   d2/dx2 %.2e' % maxError[name + 'Dx2'])
+        print ()
+    return (maxError)
+
+
+####################################################################################################
+####################################################################################################
+#
+# x <-> 1-x symmetry. 
+#
+# Swapping the roles of A and B (x <-> q = 1-x, so z1 <-> z6, z2 <-> z5, z3 <-> z4, y1 <-> y3) 
+#   leaves negX, negY, negZ, and so negYW, negXZ and negTot unchanged, and flips the sign of 
+#   epsilon0 = log(q/x). In the symmetric mode only the points with x <= 0.5 (and any point 
+#   without a mirror partner) are evaluated; the points above 0.5 are copied from their partners. 
+#
+# A point b > 0.5 has the partner a = 1 - b, and for b in [0.5, 1] that subtraction is exact, so 
+#   a partner is a grid point exactly equal to 1 - b (and then also 1 - a == b exactly). 
+#   symmetryPartners first tries the position a symmetric sorted grid would put it at (n-1-i), 
+#   and falls back to a binary search. The grids of createXValues are NOT exactly symmetric, 
+#   because of the accumulated rounding of "x = x + xIncr", so many of their upper points have no 
+#   exact partner; those are simply evaluated directly. createSymmetricXValues builds a grid 
+#   whose upper half is the exact mirror image of its lower half, so that every point pairs up. 
+# The mirrored entropies agree with directly evaluated ones to rounding (log(q) at one point is 
+#   log1p(-x) at its partner). 
+#
+####################################################################################################
+####################################################################################################
+
+SYMMETRIC_COLUMNS = ('negX', 'negY', 'negZ', 'negYW', 'negXZ', 'negTot')
+
+
+def createSymmetricXValues (xTotalSteps, xIncr):
+    # the lower half accumulates as createXValues does; an odd-sized grid gets 0.5 in the middle. 
+    #   1 - x is not exact for x < 0.5, so the lower points are snapped (by at most one ulp of 1.0) 
+    #   to 1 - upper, which is exact, and each pair then maps onto itself both ways. 
+    upper = 1.0 - vecXValues(xTotalSteps//2, xIncr)[::-1]
+    middle = np.array([0.5] if xTotalSteps % 2 else [])
+    return (np.concatenate(((1.0 - upper)[::-1], middle, upper)))
+
+
+def symmetryPartners (xArray):
+
+    x = np.asarray(xArray, dtype=np.float64)
+    upper = np.flatnonzero((x > 0.5) & (x <= 1.0))
+    target = 1.0 - x[upper]
+    partners = len(x) - 1 - upper
+    found = x[partners] == target
+    if not found.all():
+        missing = np.flatnonzero(~found)[::-1]
+        if np.all(x[1:] >= x[:-1]):
+            order = np.arange(len(x))
+            sortedX = x
+        else:
+            order = np.argsort(x, kind='stable')
+            sortedX = x[order]
+        # on a sorted grid the targets of the upper points come in descending order, so they are 
+        #   searched for in reverse, which keeps the binary searches cache-friendly
+        position = np.minimum(np.searchsorted(sortedX, target[missing]), len(x) - 1)
+        hit = sortedX[position] == target[missing]
+        partners[missing[hit]] = order[position[hit]]
+        found[missing[hit]] = True
+    return (upper[found], partners[found])
+
+
+def symmetricGridSplit (xArray):
+    # for a sorted grid whose points above 0.5 are exactly the mirror images of its first points 
+    #   (as createSymmetricXValues makes them), the k such that row j < n-k pairs with row n-1-j 
+    #   and rows [k:] can be mirrored; None for any other grid
+    x = np.asarray(xArray)
+    nPoints = len(x)
+    nMirrored = int(np.count_nonzero(x > 0.5))
+    k = nPoints - nMirrored
+    if (nMirrored == 0 or nMirrored > k or x[-1] > 1.0 or not np.all(x[k:] > 0.5) 
+            or not np.array_equal(1.0 - x[k:], x[nMirrored - 1::-1])):
+        return (None)
+    return (k)
+
+
+# below this fraction of mirrored points, finding the partners costs more than it saves
+MIN_MIRRORED_FRACTION = 0.125
+
+
+def _worthMirroring (x, nSamples=1024):
+    # on a sorted grid, estimate the mirrored fraction from a sample of the points before paying 
+    #   for the full partner search (the createXValues grids have almost no exact partners)
+    if not np.all(x[1:] >= x[:-1]):
+        return (True)
+    sample = x[::max(1, len(x)//nSamples)]
+    target = 1.0 - sample[(sample > 0.5) & (sample <= 1.0)]
+    position = np.minimum(np.searchsorted(x, target), len(x) - 1)
+    return (np.count_nonzero(x[position] == target) >= MIN_MIRRORED_FRACTION*len(sample))
+
+
+def evaluateSymmetric (func, xArray):
+
+    x = np.asarray(xArray, dtype=np.float64)
+    nPoints = len(x)
+    k = symmetricGridSplit(x)
+    if k is not None:
+        out = np.empty(nPoints, dtype=np.float64)
+        out[:k] = func(x[:k])
+        out[k:] = out[nPoints - k - 1::-1]
+        return (out)
+    if nPoints == 0 or not _worthMirroring(x):
+        return (func(x))
+    mirrored, partners = symmetryPartners(x)
+    if len(mirrored) < MIN_MIRRORED_FRACTION*nPoints:
+        return (func(x))
+    direct = np.ones(nPoints, dtype=bool)
+    direct[mirrored] = False
+    out = np.empty(nPoints, dtype=np.float64)
+    out[direct] = func(x[direct])
+    out[mirrored] = out[partners]
+    return (out)
+
+
+def _mirrorThermoRows (thermoTable, sourceRows, targetRows, x, eps0, eps1):
+    # copy whole rows in one pass, then redo the columns that are not symmetric; all the columns 
+    #   share one type, so a contiguous table can be copied as a plain 2-D array (much faster 
+    #   than copying structured records)
+    if isinstance(thermoTable, ThermoResults):
+        thermoTable.buffer[:, targetRows] = thermoTable.buffer[:, sourceRows]
+    elif thermoTable.flags['C_CONTIGUOUS']:
+        rows = thermoTable.view(thermoTable.dtype[0]).reshape(len(thermoTable), len(THERMO_COLUMNS))
+        rows[targetRows] = rows[sourceRows]
+    else:
+        thermoTable[targetRows] = thermoTable[sourceRows]
+    activEnthalpy = eps0*x
+    interactEnthalpy = -eps1*(x*x)
+    thermoTable['x'][targetRows] = x
+    thermoTable['activEnthalpy'][targetRows] = activEnthalpy
+    thermoTable['interactEnthalpy'][targetRows] = interactEnthalpy
+    thermoTable['freeEnergy'][targetRows] = activEnthalpy + interactEnthalpy + thermoTable['negX'][targetRows]
+    thermoTable['epsilon0'][targetRows] = -thermoTable['epsilon0'][targetRows]
+
+
+def computeSymmetricThermoTable (xArray, eps0, eps1, thermoTable, blockSize=DEFAULT_BLOCK_SIZE):
+
+    x = np.asarray(xArray, dtype=np.float64)
+    nPoints = len(x)
+    eps0 = np.asarray(eps0, dtype=np.float64)
+    eps1 = np.asarray(eps1, dtype=np.float64)
+    pick = lambda eps, rows: eps[rows] if eps.ndim else eps
+    k = symmetricGridSplit(x)
+    if k is not None:
+        # each block is mirrored while it is still in cache
+        nMirrored = nPoints - k
+        for lo in range(0, k, blockSize):
+            hi = min(lo + blockSize, k)
+            computeThermoTable(x[lo:hi], pick(eps0, slice(lo, hi)), pick(eps1, slice(lo, hi)), thermoTable[lo:hi], blockSize)
+            top = min(hi, nMirrored)
+            if lo < top:
+                targetRows = slice(nPoints - top, nPoints - lo)
+                _mirrorThermoRows(thermoTable, slice(top - 1, lo - 1 if lo else None, -1), targetRows, 
+                                  x[targetRows], pick(eps0, targetRows), pick(eps1, targetRows))
+        return (thermoTable)
+
+    if nPoints == 0 or not _worthMirroring(x):
+        return (computeThermoTable(x, eps0, eps1, thermoTable, blockSize))
+    mirrored, partners = symmetryPartners(x)
+    if len(mirrored) < MIN_MIRRORED_FRACTION*nPoints:
+        return (computeThermoTable(x, eps0, eps1, thermoTable, blockSize))
+    direct = np.ones(nPoints, dtype=bool)
+    direct[mirrored] = False
+    directTable = createThermoTable(np.count_nonzero(direct), dtype=thermoTable.dtype[0])
+    thermoTable[direct] = computeThermoTable(x[direct], pick(eps0, direct), pick(eps1, direct), directTable, blockSize)
+    _mirrorThermoRows(thermoTable, partners, mirrored, x[mirrored], pick(eps0, mirrored), pick(eps1, mirrored))
+    return (thermoTable)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Timing helper shared by the benchmarks: the best (smallest) wall time of `repeat` calls of 
+#   func, which keeps the figures comparable and least disturbed by other load on the machine. 
+#
+####################################################################################################
+####################################################################################################
+
+def bestTime (func, repeat):
+
+    timing = np.inf
+    for r in range(repeat):
+        start = time.perf_counter()
+        func()
+        timing = min(timing, time.perf_counter() - start)
+    return (timing)
+
+
+def benchmarkSymmetricEntropy (nPoints=10**6, repeat=5):
+
+    xIncr = 1.0/(nPoints + 1)
+    grids = (('createXValues grid', vecXValues(nPoints, xIncr)), 
+             ('createSymmetricXValues grid', createSymmetricXValues(nPoints, xIncr)))
+    thermoTable = createThermoTable(nPoints)
+    print ()
+    print (' Symmetric (x <= 0.5 only) vs. full evaluation, %d points:' % nPoints)
+    timings = {}
+    for gridName, x in grids:
+        paired = len(symmetryPartners(x)[0])
+        print ()
+        print ('   %s: %d of %d points mirrored' % (gridName, paired, nPoints))
+        print ()
+        for stage, func in (('vecNegZEntropy', vecNegZEntropy), ('vecNegYEntropy', vecNegYEntropy), 
+                            ('vecNegXEntropy', vecNegXEntropy)):
+            full = bestTime(lambda: func(x), repeat)
+            symmetric = bestTime(lambda: evaluateSymmetric(func, x), repeat)
+            timings[(gridName, stage)] = (full, symmetric)
+            print ('     %-20s' % stage, '   full %8.4f s' % full, '   symmetric %8.4f s' % symmetric, '   x%.2f' % (full/symmetric))
+        full = bestTime(lambda: computeThermoTable(x, 1.0, 0.5, thermoTable), repeat)
+        symmetric = bestTime(lambda: computeThermoTable(x, 1.0, 0.5, thermoTable, mode='symmetric'), repeat)
+        timings[(gridName, 'computeThermoTable')] = (full, symmetric)
+        print ('     %-20s' % 'computeThermoTable', '   full %8.4f s' % full, '   symmetric %8.4f s' % symmetric, '   x%.2f' % (full/symmetric))
+    print ()
+    return (timings)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Interacting systems: the h-parameter solver. 
+#
+# With an interaction enthalpy the configuration variables are no longer products of x and q; 
+#   they have to be found by minimizing the free energy. Following the 2014 paper, 
+#     h = exp(eps1/4)   (beta = 1),    interaction enthalpy = (eps1/2)*(2*y2 - y1 - y3) 
+#                                                           = (eps1/2)*(z3 + z4 - z1 - z6), 
+#   and the negative entropy is the negTot of the rest of this program, 
+#     negTot = negX + 2*negZ - 2*negY - negW. 
+#   (This scaling of the enthalpy reproduces the paper's analytic result at x1 = 0.5, 
+#   z3 = (h^2 - 3)(h^2 + 1) / (8 (h^4 - 6 h^2 + 1)); checkInteractingSolver compares the two.) 
+#
+# For a fixed x1 = x, the normalization, x1 = z1 + 2 z2 + z4 and z2 + z4 = z3 + z5 leave three 
+#   free variables, u = (z1, z3, z4): 
+#     z2 = (x - z1 - z4)/2,  z5 = z2 + z4 - z3,  z6 = 1 - 2x + z1 + z3 - z4. 
+#   All fourteen configuration variables are linear in (x, u) (see configVariablesFromZ), so the 
+#   gradient and the 3x3 Hessian of the free energy in u are exact and cheap: 
+#     grad = B^T [c (log v + 1)] + (eps1/2) dH/du,     Hess = B^T diag(c / v) B, 
+#   with B the (14, 3) map from u to the variables and c the entropy weights (with degeneracies). 
+# solveConfigEquilibrium runs damped Newton on every point of a batch at once (each step is cut 
+#   back so that no variable leaves (0, 1)), and reaches the target eps1 by continuation from the 
+#   analytic h = 1 solution, so every stage is warm-started from the neighbouring h. 
+#   A previous solution (for example the one for the neighbouring h in a sweep) can be passed in 
+#   as initialFree instead. 
+# computeInteractingThermoTable fills a THERMO_DTYPE table from the solution. Its epsilon0 column 
+#   is the eps0 for which x is an equilibrium point, -d(interaction enthalpy + negTot)/dx at the 
+#   constrained minimum; freeEnergy is eps0*x + interaction enthalpy + negTot. At h = 1 both 
+#   reduce to the no-interaction columns. Points where the solver finds no interior minimum 
+#   (the system is phase-separating towards the boundary, as for h > sqrt(3) around x1 = 0.5) 
+#   are set to NaN, with a RuntimeWarning. 
+#
+####################################################################################################
+####################################################################################################
+
+ENTROPY_GROUP_WEIGHTS = {'X': 1., 'Y': -2., 'W': -1., 'Z': 2.}
+
+DEFAULT_CONTINUATION_STEP = 0.5
+
+
+def hFromEpsilon (eps1):
+    return (np.exp(np.asarray(eps1, dtype=np.float64)/4.0))
+
+
+def epsilonFromH (h):
+    return (4.0*np.log(np.asarray(h, dtype=np.float64)))
+
+
+def zFromFreeVariables (x, freeVars):
+    z1, z3, z4 = freeVars
+    z2 = 0.5*(x - z1 - z4)
+    z5 = z2 + z4 - z3
+    z6 = 1.0 - 2.0*x + z1 + z3 - z4
+    return (np.array([z1, z2, z3, z4, z5, z6]))
+
+
+def noInteractionFreeVariables (x):
+    q = 1.0-x
+    return (np.array([x*x*x, x*q*x, q*x*q]))
+
+
+def interactionEnthalpyFromConfig (configVars, eps1):
+    return (0.5*eps1*(2.0*configVars[3] - configVars[2] - configVars[4]))
+
+
+def _configLinearMaps ():
+    # every configuration variable is v = v0 + x*dvdx + B u; read the maps off unit vectors
+    def variables (x, freeVars):
+        return (configVariablesFromZ(zFromFreeVariables(np.array([x]), np.reshape(freeVars, (3, 1))))[:, 0])
+    v0 = variables(0.0, np.zeros(3))
+    dvdx = variables(1.0, np.zeros(3)) - v0
+    freeMap = np.stack([variables(0.0, unit) - v0 for unit in np.eye(3)], axis=1)
+    weights = np.zeros(len(CONFIG_VARIABLES))
+    for group, rows in CONFIG_GROUPS.items():
+        weights[rows] = ENTROPY_GROUP_WEIGHTS[group]*CONFIG_DEGENERACY[rows]
+    enthalpy = np.array([-1.0, 2.0, -1.0])
+    return (v0, dvdx, freeMap, weights, enthalpy @ freeMap[2:5], enthalpy @ dvdx[2:5])
+
+(CONFIG_OFFSET, CONFIG_X_SLOPE, CONFIG_FREE_MAP, CONFIG_ENTROPY_WEIGHTS, 
+ ENTHALPY_FREE_SLOPE, ENTHALPY_X_SLOPE) = _configLinearMaps()
+
+# row j holds the outer product B_j B_j^T (flattened), so the Hessian is one matrix product
+CONFIG_FREE_OUTER = np.einsum('jk,jl->jkl', CONFIG_FREE_MAP, CONFIG_FREE_MAP).reshape(len(CONFIG_VARIABLES), 9)
+
+
+def _solveSymmetric3 (hess, rhs):
+    # batched Cramer's rule for (3, 3, N) symmetric systems; also returns whether each is positive definite
+    a, b, c = hess[0, 0], hess[0, 1], hess[0, 2]
+    d, e, f = hess[1, 1], hess[1, 2], hess[2, 2]
+    cof00 = d*f - e*e
+    cof01 = c*e - b*f
+    cof02 = b*e - c*d
+    cof11 = a*f - c*c
+    cof12 = b*c - a*e
+    cof22 = a*d - b*b
+    det = a*cof00 + b*cof01 + c*cof02
+    r0, r1, r2 = rhs
+    positive = (a > 0.0) & (cof22 > 0.0) & (det > 0.0)
+    return (np.array([cof00*r0 + cof01*r1 + cof02*r2, 
+                      cof01*r0 + cof11*r1 + cof12*r2, 
+                      cof02*r0 + cof12*r1 + cof22*r2]) / det, positive)
+
+
+def _newtonConfigStage (x, eps1, freeVars, tol, maxIter):
+
+    # only the points that are still iterating are carried along
+    active = np.arange(len(x))
+    converged = np.zeros(len(x), dtype=bool)
+    for iteration in range(maxIter):
+        xA = x[active]
+        freeA = freeVars[:, active]
+        configVars = configVariablesFromZ(zFromFreeVariables(xA, freeA))
+        weightedLog = CONFIG_ENTROPY_WEIGHTS[:, None]*(np.log(configVars) + 1.0)
+        grad = CONFIG_FREE_MAP.T @ weightedLog + 0.5*eps1[active]*ENTHALPY_FREE_SLOPE[:, None]
+        curvature = CONFIG_ENTROPY_WEIGHTS[:, None]/configVars
+        hess = (CONFIG_FREE_OUTER.T @ curvature).reshape(3, 3, -1)
+        # without a positive-definite Hessian there is no interior minimum to converge to 
+        #   (the distribution is heading for the boundary, e.g. past h = sqrt(3) at x1 = 0.5); 
+        #   such points are left where they are, and reported as not converged
+        step, positive = _solveSymmetric3(hess, -grad)
+        # damping: stop 10% short of the first variable that would reach zero
+        change = CONFIG_FREE_MAP @ step
+        limit = np.where(change < 0.0, -configVars/change, np.inf).min(axis=0)
+        scale = np.minimum(1.0, 0.9*limit)
+        freeVars[:, active] = np.where(positive, freeA + scale*step, freeA)
+        # converged once no variable changes by more than tol (relative), or by more than the 
+        #   rounding of x itself for variables far below x 
+        tolerance = tol*configVars + 8.0*np.finfo(np.float64).eps*xA
+        done = positive & (np.abs(change) <= tolerance).all(axis=0)
+        converged[active[done]] = True
+        active = active[positive & ~done]
+        if len(active) == 0:
+            break
+    return (freeVars, converged, iteration + 1)
+
+
+def _mirrorFreeVariables (x, freeVars):
+    # the free variables of the A <-> B mirror image (x -> 1-x: z1 <-> z6, z3 <-> z4)
+    z = zFromFreeVariables(x, freeVars)
+    return (np.array([z[5], z[3], z[2]]))
+
+
+def solveConfigEquilibrium (xArray, h, initialFree=None, continuationStep=DEFAULT_CONTINUATION_STEP, 
+                            tol=1.0e-10, maxIter=50):
+
+    x, eps1 = np.broadcast_arrays(np.asarray(xArray, dtype=np.float64), epsilonFromH(h))
+    x = np.ravel(x)
+    eps1 = np.ravel(eps1)
+    # the model is symmetric under A <-> B, so x > 0.5 is solved as its mirror image 1-x; 
+    #   this keeps the small variables near x = 1 free of cancellation
+    mirrored = x > 0.5
+    xSolve = np.where(mirrored, 1.0 - x, x)
+    # at x = 0 or 1 (and outside) every variable is pinned, and the product form is exact
+    interior = (x > 0.0) & (x < 1.0)
+    freeVars = noInteractionFreeVariables(xSolve)
+    converged = np.ones(len(x), dtype=bool)
+    iterations = 0
+    if interior.any():
+        xIn = xSolve[interior]
+        eps1In = eps1[interior]
+        if initialFree is not None:
+            initialFree = np.array(initialFree, dtype=np.float64).reshape(3, -1)*np.ones((1, len(x)))
+            initialFree = np.where(mirrored, _mirrorFreeVariables(x, initialFree), initialFree)
+            stages = [1.0]
+            freeIn = initialFree[:, interior]
+        else:
+            nStages = max(1, int(np.ceil(np.max(np.abs(eps1In))/continuationStep)))
+            stages = np.arange(1, nStages + 1)/float(nStages)
+            freeIn = freeVars[:, interior]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for fraction in stages:
+                # the intermediate stages only need to be close enough to warm-start the next one
+                stageTol = tol if fraction == stages[-1] else max(tol, 1.0e-6)
+                freeIn, convergedIn, stageIterations = _newtonConfigStage(xIn, fraction*eps1In, freeIn, stageTol, maxIter)
+                iterations += stageIterations
+        freeVars[:, interior] = freeIn
+        converged[interior] = convergedIn
+
+    z = zFromFreeVariables(xSolve, freeVars)
+    z = np.where(mirrored, z[::-1], z)
+    result = {}
+    result['x'] = x
+    result['h'] = hFromEpsilon(eps1)
+    result['freeVars'] = np.array([z[0], z[2], z[3]])
+    result['configVars'] = configVariablesFromZ(z)
+    result['converged'] = converged
+    result['iterations'] = iterations
+    return (result)
+
+
+def computeInteractingThermoTable (xArray, eps0, h, thermoTable, blockSize=DEFAULT_BLOCK_SIZE, 
+                                   continuationStep=DEFAULT_CONTINUATION_STEP):
+
+    nPoints = len(xArray)
+    if thermoTable.dtype.names != THERMO_COLUMNS:
+        raise ValueError('thermoTable must have the THERMO_DTYPE layout; use createThermoTable().')
+    if len(thermoTable) != nPoints:
+        raise ValueError('thermoTable has %d rows, but xArray has %d points.' % (len(thermoTable), nPoints))
+    eps1 = float(epsilonFromH(h))
+    nonConverged = 0
+    for lo in range(0, nPoints, blockSize):
+        hi = min(lo + blockSize, nPoints)
+        x = np.asarray(xArray[lo:hi], dtype=np.float64)
+        solution = solveConfigEquilibrium(x, h, continuationStep=continuationStep)
+        nonConverged += int(np.count_nonzero(~solution['converged']))
+        configVars = solution['configVars']
+        terms = configEntropyTerms(configVars)
+        negYW = vecNegYWEntropy(terms['negY'], terms['negW'])
+        negXZ = vecNegXZEntropy(terms['negX'], terms['negZ'])
+        negTot = vecNegTotEntropy(negYW, negXZ)
+        activEnthalpy = eps0*x
+        interactEnthalpy = interactionEnthalpyFromConfig(configVars, eps1)
+        # envelope theorem: d/dx at the constrained minimum is the partial derivative at fixed u
+        with np.errstate(divide='ignore', invalid='ignore'):
+            logTerms = np.where(configVars > 0.0, np.log(configVars) + 1.0, 0.0)
+            dGdx = (CONFIG_ENTROPY_WEIGHTS*CONFIG_X_SLOPE) @ logTerms + 0.5*eps1*ENTHALPY_X_SLOPE
+            dGdx = np.where((x > 0.0) & (x < 1.0), dGdx, np.where(x <= 0.0, -np.inf, np.inf))
+
+        block = thermoTable[lo:hi]
+        block['x'] = x
+        block['negX'] = terms['negX']
+        block['negY'] = terms['negY']
+        block['negZ'] = terms['negZ']
+        block['negYW'] = negYW
+        block['negXZ'] = negXZ
+        block['negTot'] = negTot
+        block['activEnthalpy'] = activEnthalpy
+        block['interactEnthalpy'] = interactEnthalpy
+        block['freeEnergy'] = activEnthalpy + interactEnthalpy + negTot
+        block['epsilon0'] = -dGdx
+        failed = ~solution['converged']
+        for name in THERMO_COLUMNS[1:]:
+            block[name][failed] = np.nan
+    if nonConverged:
+        warnings.warn('h-parameter solver: %d of %d points did not converge.' % (nonConverged, nPoints), RuntimeWarning)
+    return (thermoTable)
+
+
+def checkInteractingSolver (hValues=(0.6, 0.8, 1.0, 1.2, 1.4, 1.6), printResults=True):
+
+    hArray = np.asarray(hValues, dtype=np.float64)
+    solution = solveConfigEquilibrium(0.5, hArray)
+    h2 = hArray*hArray
+    analyticZ3 = (h2 - 3.0)*(h2 + 1.0)/(8.0*(h2*h2 - 6.0*h2 + 1.0))
+    solvedZ3 = solution['configVars'][CONFIG_VARIABLES.index('z3')]
+    maxError = float(np.max(np.abs(solvedZ3 - analyticZ3)))
+
+    if printResults:
+        print ()
+        print (' h-parameter solver vs. the analytic z3(h) at x1 = 0.5:')
+        print ()
+        print ('      h        z3 (solved)      z3 (analytic)' )
+        print ()
+        for p in range(len(hArray)):
+            print ('   %.4f' % hArray[p], '   %.12f' % solvedZ3[p], '   %.12f' % analyticZ3[p])
+        print ()
+        print (' Maximum difference: %.3g' % maxError)
+        print ()
+    return (maxError)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Precision modes. 
+#
+# setPrecisionMode chooses the floating-point types used by the whole pipeline (computeThermoTable, 
+#   and so everything built on it, and the tables createThermoTable allocates): 
+#     'float64'  compute and store in float64 (the default, and the reference) 
+#     'float32'  compute and store in float32 - half the memory and twice the SIMD width, but the 
+#                x*log(x) terms near x = 0 and x = 1 lose accuracy 
+#     'mixed'    compute (in particular the logs) in float64, store the results in float32 
+# The default comes from the CVM_PRECISION environment variable. precisionErrorReport measures, 
+#   for every output column, the error of each mode against the float64 reference. 
+#
+####################################################################################################
+####################################################################################################
+
+PRECISION_MODES = {'float64': (np.float64, np.float64), 
+                   'float32': (np.float32, np.float32), 
+                   'mixed':   (np.float64, np.float32)}
+
+_precisionConfig = {'mode': os.environ.get('CVM_PRECISION', 'float64')}
+
+
+def setPrecisionMode (mode):
+    if mode not in PRECISION_MODES:
+        raise ValueError('Unknown precision mode %r; expected one of %s.' % (mode, tuple(PRECISION_MODES)))
+    _precisionConfig['mode'] = mode
+
+
+def precisionDtypes ():
+    computeType, storageType = PRECISION_MODES[_precisionConfig['mode']]
+    return (np.dtype(computeType), np.dtype(storageType))
+
+
+def precisionErrorReport (xArray=None, eps0=1.0, eps1=0.5, modes=('float32', 'mixed'), printResults=True):
+
+    if xArray is None:
+        xArray = createXValues(np.zeros(99), 99, 1, 0.01)
+    savedMode = _precisionConfig['mode']
+    try:
+        setPrecisionMode('float64')
+        reference = computeThermoTable(xArray, eps0, eps1, createThermoTable(len(xArray)))
+        report = collections.OrderedDict()
+        for mode in modes:
+            setPrecisionMode(mode)
+            table = computeThermoTable(xArray, eps0, eps1, createThermoTable(len(xArray)))
+            report[mode] = collections.OrderedDict()
+            for name in THERMO_COLUMNS:
+                error = np.abs(table[name].astype(np.float64) - reference[name])
+                scale = np.maximum(np.abs(reference[name]), np.finfo(np.float64).tiny)
+                report[mode][name] = {'maxAbsError': float(np.max(error)), 'maxRelError': float(np.max(error / scale))}
+    finally:
+        setPrecisionMode(savedMode)
+
+    if printResults:
+        for mode in modes:
+            print ()
+            print (' Precision mode %s, errors against the float64 reference:' % mode)
+            print ()
+            print ('    column              max abs error   max rel error')
+            for name in THERMO_COLUMNS:
+                print ('    %-18s' % name, '   %.3e' % report[mode][name]['maxAbsError'], '     %.3e' % report[mode][name]['maxRelError'])
+        print ()
+    return (report)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Optional JIT-compiled backend (Numba), with automatic fallback to NumPy. 
+#
+# The NumPy engine builds every column from whole-array temporaries; the JIT backend instead 
+#   compiles the per-point formulas of createNegXEntropyValues, createNegYEntropyValues, 
+#   createNegZEntropyValues (and the rest of the fused table) into one loop, run in parallel 
+#   across cores with numba.prange, that writes each output value directly - no temporaries. 
+#   Each create*Values stage runs columnKernel, which computes only its own column, straight 
+#   into the (possibly strided) output slice. 
+# setComputeBackend('numpy' | 'jit' | 'auto', nThreads=None) selects it at run time (the default 
+#   comes from the CVM_BACKEND environment variable, else 'numpy'). Numba is imported, and the 
+#   kernels compiled, only on first use; if Numba is not installed, 'auto' quietly falls back to 
+#   NumPy and 'jit' falls back with a warning. 
+#
+####################################################################################################
+####################################################################################################
+
+COMPUTE_BACKENDS = ('numpy', 'jit', 'auto')
+
+_backendConfig = {'requested': os.environ.get('CVM_BACKEND', 'numpy'), 'jitKernels': None, 'jitUnavailable': False}
+
+
+def setComputeBackend (backend, nThreads=None):
+    if backend not in COMPUTE_BACKENDS:
+        raise ValueError('Unknown backend %r; expected one of %s.' % (backend, COMPUTE_BACKENDS))
+    _backendConfig['requested'] = backend
+    if nThreads is not None and activeComputeBackend() == 'jit':
+        import numba
+        numba.set_num_threads(nThreads)
+
+
+def activeComputeBackend ():
+    if _backendConfig['requested'] == 'numpy':
+        return ('numpy')
+    if _loadJitKernels() is None:
+        if _backendConfig['requested'] == 'jit':
+            warnings.warn('Numba is not installed; using the NumPy backend instead of the JIT backend.')
+            _backendConfig['requested'] = 'numpy'
+        return ('numpy')
+    return ('jit')
+
+
+def _loadJitKernels ():
+
+    if _backendConfig['jitKernels'] is not None or _backendConfig['jitUnavailable']:
+        return (_backendConfig['jitKernels'])
+    try:
+        import numba
+    except ImportError:
+        _backendConfig['jitUnavailable'] = True
+        return (None)
+    from math import log as mathLog
+    from math import log1p as mathLog1p
+
+    # 0*log(0) = 0; numba's log(0.0) returns -inf rather than raising
+    @numba.njit(inline='always')
+    def jitXlogy (a, logB):
+        return (0.0 if a == 0.0 else a*logB)
+
+    # column 0, 1, 2 = negX, negY, negZ
+    @numba.njit(parallel=True, cache=True)
+    def columnKernel (x, out, column):
+        for j in numba.prange(x.shape[0]):
+            xj = x[j]
+            q = 1.0 - xj
+            logX = mathLog(xj) if xj > 0.0 else -np.inf
+            logQ = mathLog1p(-xj) if xj < 1.0 else -np.inf
+            if column == 0:
+                out[j] = jitXlogy(xj, logX) + jitXlogy(q, logQ)
+            elif column == 1:
+                out[j] = jitXlogy(xj*xj, 2.0*logX) + 2.0*jitXlogy(xj*q, logX + logQ) + jitXlogy(q*q, 2.0*logQ)
+            else:
+                xx = xj*xj
+                qq = q*q
+                out[j] = (jitXlogy(xj*xx, 3.0*logX) + 3.0*jitXlogy(xx*q, 2.0*logX + logQ) 
+                          + 3.0*jitXlogy(xj*qq, logX + 2.0*logQ) + jitXlogy(q*qq, 3.0*logQ))
+
+    @numba.njit(parallel=True, cache=True)
+    def thermoKernel (x, eps0, eps1, outX, negX, negY, negZ, negYW, negXZ, negTot, activ, interact, free, epsilon0, analytic):
+        for j in numba.prange(x.shape[0]):
+            xj = x[j]
+            q = 1.0 - xj
+            logX = mathLog(xj) if xj > 0.0 else -np.inf
+            logQ = mathLog1p(-xj) if xj < 1.0 else -np.inf
+            nx = jitXlogy(xj, logX) + jitXlogy(q, logQ)
+            if analytic:
+                ny = 2.0*nx
+                nz = 3.0*nx
+                nw = 2.0*nx
+            else:
+                xx = xj*xj
+                qq = q*q
+                # the y- and w-pairs are the same products without interaction: one sum for both
+                pairTerms = jitXlogy(xx, 2.0*logX) + 2.0*jitXlogy(xj*q, logX + logQ) + jitXlogy(qq, 2.0*logQ)
+                ny = pairTerms
+                nw = pairTerms
+                nz = (jitXlogy(xj*xx, 3.0*logX) + 3.0*jitXlogy(xx*q, 2.0*logX + logQ) 
+                      + 3.0*jitXlogy(xj*qq, logX + 2.0*logQ) + jitXlogy(q*qq, 3.0*logQ))
+            nyw = 2.0*ny + nw
+            nxz = 2.0*nz + nx
+            outX[j] = xj
+            negX[j] = nx
+            negY[j] = ny
+            negZ[j] = nz
+            negYW[j] = nyw
+            negXZ[j] = nxz
+            negTot[j] = -(nyw - nxz)
+            act = eps0*xj
+            inter = -eps1*(xj*xj)
+            activ[j] = act
+            interact[j] = inter
+            free[j] = act + inter + nx
+            epsilon0[j] = logQ - logX
+
+    _backendConfig['jitKernels'] = {'column': columnKernel, 'thermo': thermoKernel}
+    return (_backendConfig['jitKernels'])
+
+
+JIT_ENTROPY_COLUMNS = {'negX': 0, 'negY': 1, 'negZ': 2}
+
+
+def jitEntropyColumn (xArray, name, out=None):
+    x = np.asarray(xArray, dtype=np.float64)
+    if out is None:
+        out = np.empty(len(x), dtype=np.float64)
+    _loadJitKernels()['column'](x, out, JIT_ENTROPY_COLUMNS[name])
+    return (out)
+
+
+def entropyStageFunction (name, vecFunc):
+    # the function a create*Values stage evaluates (e.g. through evaluateSymmetric): the jit 
+    #   kernel of that one column on the jit backend, else the NumPy one
+    if activeComputeBackend() == 'jit':
+        return (lambda x: jitEntropyColumn(x, name))
+    return (vecFunc)
+
+
+def jitThermoTable (xArray, eps0, eps1, thermoTable, analytic=False):
+    xArray = np.ascontiguousarray(xArray, dtype=np.float64)
+    _loadJitKernels()['thermo'](xArray, float(eps0), float(eps1), 
+                                *[thermoTable[name] for name in THERMO_COLUMNS], analytic)
+    return (thermoTable)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Streaming (chunked) sweep pipeline, for grids larger than memory. 
+#
+# generateXChunks yields the x-grid in fixed-size chunks; the values are exactly those 
+#   createXValues would produce (the running sum is carried from one chunk to the next), 
+#   and xStart allows a sweep to begin part way along, e.g. for fine refinements near x = 0 or 1. 
+#   The grid stops at x = 1: a sweep that would run past it yields fewer than xTotalSteps points. 
+# streamThermoTable pushes each chunk through the fused kernel (entropy, enthalpy and free-energy 
+#   stages), into ONE reused chunk-sized table, and hands that table to each sink in turn. 
+#   Peak memory is therefore set by chunkSize and the sinks, not by the number of grid points. 
+#
+# A sink is any object with consume(thermoTable) and close() methods; close() returns the sink's 
+#   result. Since the chunk table is reused, a sink must copy anything it wants to keep. 
+#   Three sinks are provided: 
+#     ThermoFileSink         - appends every row to a CSV file (any format: ThermoTableWriter, 
+#                              with the bulk output writers further below) 
+#     ThermoMinimumReducer   - keeps the running minimum of one column, and where it occurs 
+#     ThermoPlotDownsampler  - keeps a per-bin min/max envelope of each column, for plotting 
+#   Both skip NaN rows (and the reducer counts them), so one bad row cannot hide a real minimum. 
+#
+####################################################################################################
+####################################################################################################
+
+DEFAULT_CHUNK_SIZE = 1048576
+
+
+def generateXChunks (xTotalSteps, xIncr, chunkSize=DEFAULT_CHUNK_SIZE, xStart=0.0):
+    newX = xStart
+    for lo in range(0, xTotalSteps, chunkSize):
+        nPoints = min(chunkSize, xTotalSteps - lo)
+        increments = np.full(nPoints, xIncr, dtype=np.float64)
+        increments[0] = newX + xIncr
+        xChunk = np.cumsum(increments)
+        if xChunk[-1] > 1.0:
+            # the grid would run past x = 1 (e.g. a refinement started close to 1): stop at 1
+            xChunk = xChunk[:np.searchsorted(xChunk, 1.0, side='right')]
+            if len(xChunk):
+                yield xChunk
+            return
+        newX = xChunk[-1]
+        yield xChunk
+
+
+def streamThermoTable (xChunks, eps0, eps1, sinks, mode='fused'):
+
+    chunkTable = None
+    for xChunk in xChunks:
+        nPoints = len(xChunk)
+        if chunkTable is None or len(chunkTable) < nPoints:
+            chunkTable = createThermoTable(nPoints)
+        thermoTable = computeThermoTable(xChunk, eps0, eps1, chunkTable[:nPoints], mode=mode)
+        for sink in sinks:
+            sink.consume(thermoTable)
+
+    return ([sink.close() for sink in sinks])
+
+
+class ThermoMinimumReducer:
+
+    def __init__ (self, column='freeEnergy'):
+        self.column = column
+        self.minValue = np.inf
+        self.xAtMin = np.nan
+        self.nRows = 0
+        self.nNanRows = 0
+
+    def consume (self, thermoTable):
+        values = thermoTable[self.column]
+        nNan = int(np.count_nonzero(np.isnan(values)))
+        if nNan < len(values):
+            k = int(np.nanargmin(values))
+            if values[k] < self.minValue:
+                self.minValue = float(values[k])
+                self.xAtMin = float(thermoTable['x'][k])
+        self.nRows += len(thermoTable)
+        self.nNanRows += nNan
+
+    def close (self):
+        return ({'column': self.column, 'minValue': self.minValue, 'xAtMin': self.xAtMin, 'nRows': self.nRows, 
+                 'nNanRows': self.nNanRows})
+
+
+class ThermoPlotDownsampler:
+
+    def __init__ (self, nBins=2000, columns=THERMO_COLUMNS[1:], xMin=0.0, xMax=1.0):
+        self.nBins = nBins
+        self.columns = tuple(columns)
+        self.xMin = xMin
+        self.xMax = xMax
+        self.binMin = {name: np.full(nBins, np.inf) for name in self.columns}
+        self.binMax = {name: np.full(nBins, -np.inf) for name in self.columns}
+        self.binCount = np.zeros(nBins, dtype=np.int64)
+
+    def consume (self, thermoTable):
+        scaled = (thermoTable['x'] - self.xMin) * (self.nBins / (self.xMax - self.xMin))
+        binIndex = np.clip(scaled.astype(np.int64), 0, self.nBins - 1)
+        self.binCount += np.bincount(binIndex, minlength=self.nBins)
+        # fmin / fmax ignore NaN rows instead of spreading them into the bins
+        for name in self.columns:
+            np.fmin.at(self.binMin[name], binIndex, thermoTable[name])
+            np.fmax.at(self.binMax[name], binIndex, thermoTable[name])
+
+    def close (self):
+        filled = self.binCount > 0
+        binWidth = (self.xMax - self.xMin) / self.nBins
+        result = {'x': (self.xMin + (np.arange(self.nBins) + 0.5) * binWidth)[filled]}
+        for name in self.columns:
+            result[name + 'Min'] = self.binMin[name][filled]
+            result[name + 'Max'] = self.binMax[name][filled]
+        return (result)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Non-uniform and adaptive x-grids. 
+#
+# createXValues builds a uniform grid by repeated addition of xIncr. The interesting behaviour 
+#   (diverging entropy slopes, epsilon0 blowing up) is all near x = 0 and x = 1, so these 
+#   generators put their points there instead: 
+#     createLogitXValues      - uniform in u = log(x/(1-x)), between xMin and 1-xMin 
+#     createChebyshevXValues  - Chebyshev nodes on (0,1), clustered towards both ends 
+#     createAdaptiveXValues   - error-driven bisection: starting from a coarse logit grid, each 
+#                               interval whose midpoint is not reproduced to within tolerance by 
+#                               linear interpolation of the chosen column is split, until every 
+#                               interval passes; only failing intervals are re-tested, and once 
+#                               maxPoints is reached the last splits go to the largest errors 
+# All of them return a sorted xArray. Every downstream stage accepts such a grid as it is: 
+#   the create*Values functions only use xIncr inside createXValues, so they can be called as 
+#   create*Values(xArray, outArray, len(xArray), 1, None), and computeThermoTable, and the 
+#   streaming pipeline via generateArrayChunks, take the x-values directly. 
+#
+####################################################################################################
+####################################################################################################
+
+def createLogitXValues (nPoints, xMin=1.0e-6):
+    uMax = np.log((1.0 - xMin) / xMin)
+    u = np.linspace(-uMax, uMax, nPoints)
+    return (1.0 / (1.0 + np.exp(-u)))
+
+
+def createChebyshevXValues (nPoints):
+    k = np.arange(nPoints)
+    return (0.5 * (1.0 - np.cos(np.pi * (k + 0.5) / nPoints)))
+
+
+def generateArrayChunks (xArray, chunkSize=DEFAULT_CHUNK_SIZE):
+    for lo in range(0, len(xArray), chunkSize):
+        yield xArray[lo:lo + chunkSize]
+
+
+def evaluateThermoColumn (xArray, column, eps0=0.0, eps1=0.0):
+    thermoTable = computeThermoTable(xArray, eps0, eps1, createThermoTable(len(xArray)))
+    return (np.ascontiguousarray(thermoTable[column]))
+
+
+def createAdaptiveXValues (tolerance=1.0e-6, column='negTot', eps0=0.0, eps1=0.0, xMin=1.0e-6, 
+                           initialPoints=33, maxPoints=10**6):
+
+    xArray = createLogitXValues(initialPoints, xMin)
+    fArray = evaluateThermoColumn(xArray, column, eps0, eps1)
+
+    # only the intervals that still have to be tested are carried from round to round (an interval 
+    #   that passed once never changes), so every midpoint is evaluated exactly once
+    xLo, xHi, fLo, fHi = xArray[:-1], xArray[1:], fArray[:-1], fArray[1:]
+    accepted = [xArray]
+    nPoints = len(xArray)
+    while len(xLo) and nPoints < maxPoints:
+        xMid = 0.5 * (xLo + xHi)
+        fMid = evaluateThermoColumn(xMid, column, eps0, eps1)
+        error = np.abs(fMid - 0.5 * (fLo + fHi))
+        split = np.nonzero(error > tolerance)[0]
+        budget = maxPoints - nPoints
+        if len(split) > budget:
+            # the last points allowed go to the intervals with the largest errors
+            split = np.sort(split[np.argpartition(error[split], -budget)[-budget:]])
+        accepted.append(xMid[split])
+        nPoints += len(split)
+        xLo, xHi = np.concatenate((xLo[split], xMid[split])), np.concatenate((xMid[split], xHi[split]))
+        fLo, fHi = np.concatenate((fLo[split], fMid[split])), np.concatenate((fMid[split], fHi[split]))
+
+    return (np.sort(np.concatenate(accepted)))
+
+
+####################################################################################################
+####################################################################################################
+#
+# Function to measure the interpolation accuracy of a grid. 
+# The column is evaluated exactly on nTest points between the first and last grid points, and 
+#   compared with linear interpolation from the grid; the maximum absolute error is returned. 
+# compareAdaptiveAndUniformGrids uses this to find how many uniform points are needed to match an 
+#   adaptive grid's accuracy, and prints the ratio. 
+#
+####################################################################################################
+####################################################################################################
+
+def interpolationError (xArray, column='negTot', eps0=0.0, eps1=0.0, nTest=200001):
+    xTest = np.linspace(xArray[0], xArray[-1], nTest)
+    exact = evaluateThermoColumn(xTest, column, eps0, eps1)
+    interpolated = np.interp(xTest, xArray, evaluateThermoColumn(xArray, column, eps0, eps1))
+    return (float(np.max(np.abs(interpolated - exact))))
+
+
+def compareAdaptiveAndUniformGrids (tolerance=1.0e-6, column='negTot', eps0=0.0, eps1=0.0, xMin=1.0e-6):
+
+    adaptive = createAdaptiveXValues(tolerance, column, eps0, eps1, xMin)
+    adaptiveError = interpolationError(adaptive, column, eps0, eps1)
+
+    nUniform = len(adaptive)
+    while True:
+        uniform = np.linspace(adaptive[0], adaptive[-1], nUniform)
+        uniformError = interpolationError(uniform, column, eps0, eps1)
+        if uniformError <= adaptiveError or nUniform >= 2**26:
+            break
+        nUniform *= 2
+
+    print ()
+    print (' Grid needed for a maximum %s interpolation error of %.2e:' % (column, adaptiveError))
+    print ('   adaptive grid:  %10d points' % len(adaptive))
+    print ('   uniform grid:   %10d points (max error %.2e)' % (nUniform, uniformError))
+    print ('   ratio:          %10.1f' % (nUniform / len(adaptive)))
+    print ()
+    return (len(adaptive), nUniform)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Incremental grid refinement. 
+#
+# Halving xIncr and calling createXValues and the create*Values functions again recomputes every 
+#   point, although half of them were already evaluated on the coarser grid. A ThermoRefinementStore 
+#   keeps one sorted, contiguous THERMO_DTYPE table, indexed by x, and only ever evaluates points 
+#   it does not hold yet: 
+#     addPoints(xNew)  evaluates the x-values that are not in the store, and merges them in 
+#     refine()         halves the spacing - the midpoint of every gap, plus half a step beyond 
+#                      each end while that stays clear of 0 and 1 - so 99 points become 199, 
+#                      399, ... and each level evaluates only its new points 
+#     lookup(xValues)  returns the stored rows for x-values that are in the store 
+# The x-values already in the store are kept exactly as they were evaluated; the midpoints of a 
+#   createXValues grid are therefore not bit-identical to createXValues(xIncr/2), which carries 
+#   its own accumulated rounding. nEvaluated counts the points actually computed. 
+# The merge itself still copies the old rows once per level, so at large sizes a level costs 
+#   about the evaluation of its new points plus one pass over the table. 
+#
+####################################################################################################
+####################################################################################################
+
+def _thermoRows (thermoTable):
+    # all the columns share one type, so the rows of a contiguous table can be moved around as a 
+    #   plain 2-D array, which is much faster than copying structured records
+    return (thermoTable.view(thermoTable.dtype[0]).reshape(len(thermoTable), len(THERMO_COLUMNS)))
+
+
+class ThermoRefinementStore:
+
+    def __init__ (self, xArray, eps0=1.0, eps1=0.0, mode='fused'):
+        self.eps0 = eps0
+        self.eps1 = eps1
+        self.mode = mode
+        self.table = createThermoTable(0)
+        self.nEvaluated = 0
+        self.addPoints(xArray)
+
+    def __len__ (self):
+        return (len(self.table))
+
+    @property
+    def x (self):
+        return (self.table['x'])
+
+    def _evaluate (self, xNew, thermoTable):
+        computeThermoTable(xNew, self.eps0, self.eps1, thermoTable, mode=self.mode)
+        self.nEvaluated += len(xNew)
+
+    def addPoints (self, xNew):
+        xNew = np.unique(np.asarray(xNew, dtype=np.float64))
+        xOld = self.table['x']
+        position = np.searchsorted(xOld, xNew)
+        if len(xOld):
+            fresh = xOld[np.minimum(position, len(xOld) - 1)] != xNew
+            xNew = xNew[fresh]
+            position = position[fresh]
+        if len(xNew) == 0:
+            return (0)
+        newRows = createThermoTable(len(xNew), dtype=self.table.dtype[0])
+        self._evaluate(xNew, newRows)
+        merged = createThermoTable(len(xOld) + len(xNew), dtype=self.table.dtype[0])
+        newIndex = position + np.arange(len(xNew))
+        oldIndex = np.ones(len(merged), dtype=bool)
+        oldIndex[newIndex] = False
+        mergedRows = _thermoRows(merged)
+        mergedRows[newIndex] = _thermoRows(newRows)
+        mergedRows[oldIndex] = _thermoRows(self.table)
+        self.table = merged
+        return (len(xNew))
+
+    def refine (self):
+        x = self.table['x']
+        if len(x) < 2:
+            raise ValueError('refine() needs at least two points in the store.')
+        xMid = 0.5*(x[:-1] + x[1:])
+        if np.any(xMid <= x[:-1]) or np.any(xMid >= x[1:]):
+            # gaps at the resolution limit have no new midpoint
+            xMid = xMid[(xMid > x[:-1]) & (xMid < x[1:])]
+            return (self.addPoints(xMid))
+        # an end point is only added if it stays at least a quarter step clear of 0 or 1
+        below = x[0] - 0.5*(x[1] - x[0])
+        above = x[-1] + 0.5*(x[-1] - x[-2])
+        addAbove = above < 1.0 - 0.25*(x[-1] - x[-2])
+        start = 1 if below > 0.25*(x[1] - x[0]) else 0
+        nNew = len(xMid) + start + (1 if addAbove else 0)
+        # the new points interleave with the old ones: old, mid, old, mid, ..., old
+        merged = createThermoTable(len(x) + nNew, dtype=self.table.dtype[0])
+        nOld = len(x)
+        _thermoRows(merged)[start:start + 2*nOld - 1:2] = _thermoRows(self.table)
+        self._evaluate(xMid, merged[start + 1:start + 2*nOld - 1:2])
+        if start:
+            self._evaluate(np.array([below]), merged[:1])
+        if addAbove:
+            self._evaluate(np.array([above]), merged[-1:])
+        self.table = merged
+        return (nNew)
+
+    def lookup (self, xValues):
+        xValues = np.asarray(xValues, dtype=np.float64)
+        xOld = self.table['x']
+        position = np.minimum(np.searchsorted(xOld, xValues), max(len(xOld) - 1, 0))
+        if len(xOld) == 0 or not np.all(xOld[position] == xValues):
+            raise ValueError('lookup: some x-values are not in the store; use addPoints() first.')
+        return (self.table[position])
+
+
+def benchmarkIncrementalRefinement (xTotalSteps=99, xIncr=0.01, maxPoints=10**6):
+
+    store = ThermoRefinementStore(vecXValues(xTotalSteps, xIncr))
+    print ()
+    print (' Incremental refinement vs. recomputing every level from scratch:')
+    print ()
+    print ('      points      new points     incremental      from scratch' )
+    print ()
+    totals = [0.0, 0.0]
+    while len(store) < maxPoints:
+        start = time.perf_counter()
+        nNew = store.refine()
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        computeThermoTable(store.x.copy(), store.eps0, store.eps1, createThermoTable(len(store)))
+        scratch = time.perf_counter() - start
+        totals[0] += incremental
+        totals[1] += scratch
+        print ('   %10d' % len(store), '   %10d' % nNew, '   %10.4f s' % incremental, '   %10.4f s' % scratch)
+    print ()
+    print ('   total', '                      %10.4f s' % totals[0], '   %10.4f s' % totals[1])
+    print ()
+    return (totals)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Interpolation lookup tables: O(1) queries of a column at arbitrary x. 
+#
+# A ThermoLookupTable stores, for each requested column, a cubic Hermite interpolant on nCells 
+#   uniform cells of [xLo, xHi]: the node values come from computeThermoTable, and the node 
+#   slopes from the analytic first derivatives (LOOKUP_COLUMN_DERIVATIVES). A query finds its cell 
+#   with one multiply, and evaluates the cubic with Horner's rule, so a batch of queries costs a 
+#   handful of vectorized passes and no logs. 
+#
+# The error of cubic Hermite interpolation on a cell of width h is at most 
+#     h^4/384 * max |f''''| 
+#   and, without interaction, every entropy column is a multiple of negX = x log x + q log q, 
+#   whose fourth derivative 2/x^3 + 2/q^3 is convex - so its maximum over a cell is at one of the 
+#   cell's ends, and the bound can be evaluated exactly per cell (epsilon0 = log(q/x) likewise has 
+#   |f''''| <= 6/x^4 + 6/q^4; x and the enthalpies are polynomials of degree <= 2, reproduced 
+#   exactly). An allowance of a few tens of ulps is added to each bound for the rounding of the 
+#   node values themselves (negTot is a difference of much larger sums). Cells whose bound exceeds tolerance 
+#   (in practice only the ones next to x = 0 and x = 1, where the slopes diverge), and queries 
+#   outside [xLo, xHi], are answered by direct evaluation instead, so every answer is within 
+#   tolerance of the direct formulas. checkLookupTable verifies this on random queries. 
+#
+####################################################################################################
+####################################################################################################
+
+# column: (multiple of negX in the entropy part, with the first derivative in closed form)
+def _negXSlope (x):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.log(x) - np.log1p(-x))
+
+
+def _negXFourthBound (x):
+    q = 1.0-x
+    with np.errstate(divide='ignore'):
+        return (2.0/(x*x*x) + 2.0/(q*q*q))
+
+
+LOOKUP_COLUMN_DERIVATIVES = {
+    'x':                (lambda x, eps0, eps1: np.ones_like(x),                      lambda x: 0.0*x),
+    'negX':             (lambda x, eps0, eps1: _negXSlope(x),                        _negXFourthBound),
+    'negY':             (lambda x, eps0, eps1: 2.0*_negXSlope(x),                    lambda x: 2.0*_negXFourthBound(x)),
+    'negZ':             (lambda x, eps0, eps1: 3.0*_negXSlope(x),                    lambda x: 3.0*_negXFourthBound(x)),
+    'negYW':            (lambda x, eps0, eps1: 6.0*_negXSlope(x),                    lambda x: 6.0*_negXFourthBound(x)),
+    'negXZ':            (lambda x, eps0, eps1: 7.0*_negXSlope(x),                    lambda x: 7.0*_negXFourthBound(x)),
+    'negTot':           (lambda x, eps0, eps1: _negXSlope(x),                        _negXFourthBound),
+    'activEnthalpy':    (lambda x, eps0, eps1: eps0 + 0.0*x,                         lambda x: 0.0*x),
+    'interactEnthalpy': (lambda x, eps0, eps1: -2.0*eps1*x,                          lambda x: 0.0*x),
+    'freeEnergy':       (lambda x, eps0, eps1: eps0 - 2.0*eps1*x + _negXSlope(x),    _negXFourthBound),
+    'epsilon0':         (lambda x, eps0, eps1: -(1.0/x + 1.0/(1.0-x)),               lambda x: 6.0/x**4 + 6.0/(1.0-x)**4),
+}
+
+
+class ThermoLookupTable:
+
+    def __init__ (self, columns=('negTot', 'freeEnergy'), eps0=1.0, eps1=0.0, nCells=2**16, 
+                  xLo=0.0, xHi=1.0, tolerance=1.0e-10):
+        self.columns = tuple(columns)
+        for name in self.columns:
+            if name not in LOOKUP_COLUMN_DERIVATIVES:
+                raise ValueError('No lookup table for column %r; expected one of %s.' % (name, THERMO_COLUMNS))
+        self.eps0 = eps0
+        self.eps1 = eps1
+        self.nCells = nCells
+        self.xLo = xLo
+        self.xHi = xHi
+        self.tolerance = tolerance
+        self.h = (xHi - xLo)/nCells
+        self.invH = nCells/(xHi - xLo)
+
+        xNodes = xLo + self.h*np.arange(nCells + 1)
+        xNodes[-1] = xHi
+        nodes = computeThermoTable(xNodes, eps0, eps1, createThermoTable(nCells + 1, dtype=np.float64))
+        self.coefficients = {}
+        self.errorBound = {}
+        self.direct = np.zeros(nCells, dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for name in self.columns:
+                slope, fourthBound = LOOKUP_COLUMN_DERIVATIVES[name]
+                f = nodes[name]
+                d = self.h*slope(xNodes, eps0, eps1)
+                f0, f1, d0, d1 = f[:-1], f[1:], d[:-1], d[1:]
+                coefficients = np.empty((nCells, 4))
+                coefficients[:, 0] = f0
+                coefficients[:, 1] = d0
+                coefficients[:, 2] = 3.0*(f1 - f0) - 2.0*d0 - d1
+                coefficients[:, 3] = 2.0*(f0 - f1) + d0 + d1
+                fourth = fourthBound(xNodes)
+                bound = (self.h**4/384.0)*np.maximum(fourth[:-1], fourth[1:])
+                bound = bound + 32.0*np.finfo(np.float64).eps*(np.abs(f0) + np.abs(f1) + np.abs(d0) + np.abs(d1))
+                bound = np.where(np.isfinite(coefficients).all(axis=1), bound, np.inf)
+                self.coefficients[name] = coefficients
+                self.errorBound[name] = bound
+                self.direct |= ~(bound <= tolerance)
+        # the directly answered cells are never interpolated; clear their (possibly infinite) coefficients
+        for name in self.columns:
+            self.coefficients[name][self.direct] = 0.0
+
+    def query (self, xValues, columns=None):
+        columns = self.columns if columns is None else tuple(columns)
+        x = np.asarray(xValues, dtype=np.float64).ravel()
+        outside = ~((x >= self.xLo) & (x <= self.xHi))
+        scaled = (np.where(outside, self.xLo, x) - self.xLo)*self.invH
+        cell = np.minimum(scaled.astype(np.intp), self.nCells - 1)
+        t = scaled - cell
+        fallback = outside | self.direct[cell]
+        results = {}
+        for name in columns:
+            # np.take gathers whole rows several times faster than fancy indexing
+            c = np.take(self.coefficients[name], cell, axis=0)
+            results[name] = c[:, 0] + t*(c[:, 1] + t*(c[:, 2] + t*c[:, 3]))
+        if fallback.any():
+            xDirect = x[fallback]
+            exact = computeThermoTable(xDirect, self.eps0, self.eps1, createThermoTable(len(xDirect), dtype=np.float64))
+            for name in columns:
+                results[name][fallback] = exact[name]
+        return (results)
+
+    def maxErrorBound (self, column):
+        bound = self.errorBound[column]
+        return (float(np.max(bound[~self.direct])) if (~self.direct).any() else 0.0)
+
+
+def checkLookupTable (lookupTable, nTest=10**6, seed=0, printResults=True):
+
+    xTest = np.random.default_rng(seed).uniform(lookupTable.xLo, lookupTable.xHi, nTest)
+    xTest[:4] = (lookupTable.xLo, lookupTable.xHi, 0.5, 1.0e-12)
+    looked = lookupTable.query(xTest)
+    exact = computeThermoTable(xTest, lookupTable.eps0, lookupTable.eps1, createThermoTable(nTest, dtype=np.float64))
+    maxError = {}
+    with np.errstate(invalid='ignore'):
+        for name in lookupTable.columns:
+            finite = np.isfinite(exact[name])
+            maxError[name] = float(np.max(np.abs(looked[name] - exact[name])[finite]))
+
+    if printResults:
+        print ()
+        print (' Lookup table (%d cells, %d answered directly) vs. direct evaluation, %d random queries:' 
+               % (lookupTable.nCells, np.count_nonzero(lookupTable.direct), nTest))
+        print ()
+        for name in lookupTable.columns:
+            print ('   %-16s' % name, '   max error %.3e' % maxError[name], '   bound %.3e' % lookupTable.maxErrorBound(name), 
+                   '   tolerance %.1e' % lookupTable.tolerance)
+        print ()
+    return (maxError)
+
+
+def benchmarkLookupTable (nQueries=10**6, columns=('negTot', 'freeEnergy'), nCells=2**16, repeat=5):
+
+    lookupTable = ThermoLookupTable(columns, nCells=nCells)
+    xQuery = np.random.default_rng(1).uniform(0.0, 1.0, nQueries)
+    thermoTable = createThermoTable(nQueries)
+
+    lookup = bestTime(lambda: lookupTable.query(xQuery), repeat)
+    direct = bestTime(lambda: computeThermoTable(xQuery, lookupTable.eps0, lookupTable.eps1, thermoTable), repeat)
+    single = bestTime(lambda: vecNegXEntropy(xQuery), repeat)
+    print ()
+    print (' Lookup-table queries for %s, %d random x-values:' % (', '.join(columns), nQueries))
+    print ()
+    print ('   lookup table         %8.4f s' % lookup, '   %.3e queries/s' % (nQueries/lookup))
+    print ('   computeThermoTable   %8.4f s' % direct, '   %.3e queries/s' % (nQueries/direct))
+    print ('   vecNegXEntropy       %8.4f s' % single, '   %.3e queries/s' % (nQueries/single))
+    print ()
+    return (lookup, direct, single)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Inverse solver: the equilibrium x for given epsilon0 (and eps1), for large batches. 
+#
+# The equilibrium condition for the free energy F = eps0*x - eps1*x*x + negXEntropy is 
+#     dF/dx = eps0 - 2*eps1*x + log(x) - log(1-x) = 0 . 
+# With eps1 = 0 this is exactly the relation computeEpsilonValues tabulates, and its inverse is 
+#   the logistic function, x = 1/(1 + exp(eps0)). With eps1 != 0 there is no closed form, so the 
+#   condition is solved by a vectorized, bracketed Newton iteration in u = log(x/(1-x)), where it 
+#   reads g(u) = u + eps0 - 2*eps1*sigmoid(u) = 0. Since 0 < sigmoid(u) < 1, every root lies in 
+#     [-eps0 + min(0, 2*eps1),  -eps0 + max(0, 2*eps1)] , 
+#   and a Newton step that leaves the (shrinking) bracket is replaced by a bisection step. 
+# For eps1 > 2 the condition can have three roots (two minima and a maximum of F); this solver 
+#   returns one of them - use findEquilibriumX to get the minima. 
+#
+####################################################################################################
+####################################################################################################
+
+def logistic (u):
+    expNegAbs = np.exp(-np.abs(u))
+    return (np.where(u >= 0, 1.0 / (1.0 + expNegAbs), expNegAbs / (1.0 + expNegAbs)))
+
+
+def solveLogitRoot (eps0, eps1, uLo, uHi, uStart, tol=1.0e-14, maxIter=100):
+
+    u = np.clip(uStart, uLo, uHi)
+    for iteration in range(maxIter):
+        s = logistic(u)
+        g = u + eps0 - 2.0*eps1*s
+        dg = 1.0 - 2.0*eps1*s*(1.0 - s)
+        below = g < 0
+        uLo = np.where(below, u, uLo)
+        uHi = np.where(below, uHi, u)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            uNew = u - g/dg
+        outside = ~((uNew >= uLo) & (uNew <= uHi))
+        uNew = np.where(outside, 0.5*(uLo + uHi), uNew)
+        converged = np.abs(uNew - u) <= tol*(1.0 + np.abs(u))
+        u = uNew
+        if np.all(converged):
+            break
+    return (u)
+
+
+def solveXFromEpsilon (eps0Array, eps1=0.0, tol=1.0e-14, maxIter=100):
+
+    eps0Array = np.asarray(eps0Array, dtype=np.float64)
+    if np.isscalar(eps1) and eps1 == 0.0:
+        return (logistic(-eps0Array))
+
+    eps0Array, eps1Array = np.broadcast_arrays(eps0Array, np.asarray(eps1, dtype=np.float64))
+    uLo = -eps0Array + np.minimum(0.0, 2.0*eps1Array)
+    uHi = -eps0Array + np.maximum(0.0, 2.0*eps1Array)
+    u = solveLogitRoot(eps0Array, eps1Array, uLo, uHi, -eps0Array + eps1Array, tol, maxIter)
+    return (logistic(u))
+
+
+####################################################################################################
+####################################################################################################
+#
+# Accuracy check for the inverse solver, against the forward table. 
+# epsilon0 is computed on the grid with computeEpsilonValues (shifted by 2*eps1*x when eps1 != 0), 
+#   fed back through solveXFromEpsilon, and the largest |x - x_recovered| is returned for each eps1. 
+#   (Only eps1 < 2 is checked: at eps1 = 2 the root at x = 1/2 is degenerate, and above it the 
+#   inverse is not unique.) 
+#
+####################################################################################################
+####################################################################################################
+
+def checkInverseAgainstForward (xTotalSteps=99, xStep=1, xIncr=0.01, eps1Values=(0.0, 0.5, 1.0, 1.5)):
+
+    xArray = createXValues(np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+    epsilonComputedArray = computeEpsilonValues(xArray, np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+    sel = gridSlice(xTotalSteps, xStep)
+    xArray = xArray[sel]
+    epsilonComputedArray = epsilonComputedArray[sel]
+
+    maxError = {}
+    for eps1 in eps1Values:
+        eps0Array = epsilonComputedArray + 2.0*eps1*xArray
+        maxError[eps1] = float(np.max(np.abs(solveXFromEpsilon(eps0Array, eps1) - xArray)))
+    return (maxError)
+
+
+def benchmarkInverseSolver (nQueries=10**6, eps1Values=(0.0, 0.5, 1.5), repeat=3):
+
+    eps0Array = np.random.default_rng(0).uniform(-10.0, 10.0, nQueries)
+    print ()
+    print (' Inverse solver, %d epsilon0 queries per call:' % nQueries)
+    print ()
+    timings = {}
+    for eps1 in eps1Values:
+        best = bestTime(lambda: solveXFromEpsilon(eps0Array, eps1), repeat)
+        timings[eps1] = best
+        print ('   eps1 = %.2f' % eps1, '   %8.4f s' % best, '   %.3e queries/s' % (nQueries / best))
+    print ()
+    return (timings)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Vectorized free-energy minimizer: the equilibrium x for batches of (eps0, eps1) pairs. 
+#
+# findEquilibriumX finds the minima of 
+#     F(x) = eps0*x - eps1*x*x + negEntropy(x) 
+#   for each pair (eps0Array[i], eps1Array[i]), with negEntropy either negXEntropy 
+#   (entropy='simple', the createSimpleIsingValues free energy) or the full CVM negTotEntropy 
+#   (entropy='cvm'). With no interaction in the configuration variables, negTot reduces to negX 
+#   (see the analytic mode of computeThermoTable), so both share the stationarity condition 
+#     g(u) = u + eps0 - 2*eps1*sigmoid(u) = 0 ,  u = log(x/(1-x)) , 
+#   and differ only in the free-energy values reported. 
+# For eps1 <= 2, g is increasing and there is one minimum. For eps1 > 2, g has turning points 
+#   at u = -a and u = +a, a = log(s+/s-), s+- = (1 +- sqrt(1 - 2/eps1))/2; a root on the 
+#   increasing branch below -a and/or above +a is a minimum, and when both exist the system has 
+#   two minima (phase coexistence region). Each branch is solved with the bracketed Newton 
+#   iteration of solveLogitRoot, so a whole batch costs a few vectorized iterations. 
+#
+####################################################################################################
+####################################################################################################
+
+def findEquilibriumX (eps0Array, eps1Array, entropy='simple', tol=1.0e-14, maxIter=100):
+
+    if entropy not in ('simple', 'cvm'):
+        raise ValueError("entropy must be 'simple' or 'cvm', not %r." % (entropy,))
+    eps0Array, eps1Array = np.broadcast_arrays(np.asarray(eps0Array, dtype=np.float64), np.asarray(eps1Array, dtype=np.float64))
+    eps0Array = eps0Array.ravel()
+    eps1Array = eps1Array.ravel()
+
+    uLo = -eps0Array + np.minimum(0.0, 2.0*eps1Array)
+    uHi = -eps0Array + np.maximum(0.0, 2.0*eps1Array)
+
+    # Turning points of g; a = 0 when eps1 <= 2, and the two branches then meet
+    split = eps1Array > 2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.where(split, 1.0 - 2.0/eps1Array, 0.0))
+        a = np.log((1.0 + root) / (1.0 - root))
+    lowTop = np.minimum(-a, uHi)
+    highBottom = np.maximum(a, uLo)
+
+    gLowTop = lowTop + eps0Array - 2.0*eps1Array*logistic(lowTop)
+    gHighBottom = highBottom + eps0Array - 2.0*eps1Array*logistic(highBottom)
+    hasLow = gLowTop >= 0.0
+    hasHigh = gHighBottom <= 0.0
+    # Without a turning point a single root lies in [uLo, uHi]; count it once, as the low one
+    hasHigh = hasHigh & (split | ~hasLow)
+
+    uLowMin = solveLogitRoot(eps0Array, eps1Array, uLo.copy(), lowTop, 0.5*(uLo + lowTop), tol, maxIter)
+    uHighMin = solveLogitRoot(eps0Array, eps1Array, highBottom, uHi.copy(), 0.5*(highBottom + uHi), tol, maxIter)
+    xLow = np.where(hasLow, logistic(uLowMin), np.nan)
+    xHigh = np.where(hasHigh, logistic(uHighMin), np.nan)
+
+    column = 'negX' if entropy == 'simple' else 'negTot'
+    freeEnergy = {}
+    for branch, xBranch in (('Low', xLow), ('High', xHigh)):
+        xSafe = np.where(np.isnan(xBranch), 0.5, xBranch)
+        thermoTable = computeThermoTable(xSafe, eps0Array, eps1Array, createThermoTable(len(xSafe)))
+        values = thermoTable['activEnthalpy'] + thermoTable['interactEnthalpy'] + thermoTable[column]
+        freeEnergy[branch] = np.where(np.isnan(xBranch), np.inf, values)
+
+    lowIsGlobal = freeEnergy['Low'] <= freeEnergy['High']
+    result = {'eps0': eps0Array, 'eps1': eps1Array, 
+              'xLow': xLow, 'xHigh': xHigh, 
+              'freeEnergyLow': np.where(hasLow, freeEnergy['Low'], np.nan), 
+              'freeEnergyHigh': np.where(hasHigh, freeEnergy['High'], np.nan), 
+              'xEq': np.where(lowIsGlobal, xLow, xHigh), 
+              'freeEnergyEq': np.minimum(freeEnergy['Low'], freeEnergy['High']), 
+              'nMinima': hasLow.astype(int) + hasHigh.astype(int)}
+    result['multipleMinima'] = result['nMinima'] == 2
+    return (result)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Memoized cache of the eps-independent entropy columns. 
+#
+# x, negX, negY, negZ, negYW, negXZ, negTot (and epsilon0) depend only on the grid, not on eps0 
+#   or eps1. getEntropyColumns computes them once per grid definition 
+#   (xTotalSteps, xStep, xIncr, dtype, and the precision mode), and keeps them in an LRU cache 
+#   whose total size is capped at ENTROPY_CACHE_MAX_BYTES (see setEntropyCacheLimit); the least 
+#   recently used grids are evicted first, and a grid larger than the cap is computed but not kept. 
+# computeThermoTableCached then only has to add the cheap linear/quadratic enthalpy terms for each 
+#   (eps0, eps1), so a sweep costs O(N logs + P*N multiplies) rather than O(P*N logs). 
+# The cached arrays are marked read-only, since they are shared between callers. 
+# If an on-disk entropy store is configured (see openEntropyStore), a miss is served from it. 
+#
+####################################################################################################
+####################################################################################################
+
+ENTROPY_COLUMNS = ('x', 'negX', 'negY', 'negZ', 'negYW', 'negXZ', 'negTot', 'epsilon0')
+
+ENTROPY_CACHE_MAX_BYTES = 512 * 2**20
+
+_entropyCache = collections.OrderedDict()
+_entropyCacheStats = {'maxBytes': ENTROPY_CACHE_MAX_BYTES, 'bytes': 0, 'hits': 0, 'misses': 0}
+
+
+def _evictEntropyCache ():
+    while _entropyCache and _entropyCacheStats['bytes'] > _entropyCacheStats['maxBytes']:
+        key, columns = _entropyCache.popitem(last=False)
+        _entropyCacheStats['bytes'] -= sum(column.nbytes for column in columns.values())
+
+
+def setEntropyCacheLimit (maxBytes):
+    _entropyCacheStats['maxBytes'] = int(maxBytes)
+    _evictEntropyCache()
+
+
+def clearEntropyCache ():
+    _entropyCache.clear()
+    _entropyCacheStats.update(bytes=0, hits=0, misses=0)
+
+
+def entropyCacheInfo ():
+    info = dict(_entropyCacheStats)
+    info['entries'] = len(_entropyCache)
+    return (info)
+
+
+def getEntropyColumns (xTotalSteps, xStep, xIncr, dtype=np.float64):
+
+    key = (int(xTotalSteps), int(xStep), float(xIncr), np.dtype(dtype).str, _precisionConfig['mode'])
+    if key in _entropyCache:
+        _entropyCache.move_to_end(key)
+        _entropyCacheStats['hits'] += 1
+        return (_entropyCache[key])
+
+    _entropyCacheStats['misses'] += 1
+    if _entropyStoreConfig['cacheDir']:
+        columns = openEntropyStore(_entropyStoreConfig['cacheDir'], xTotalSteps, xStep, xIncr, dtype)
+    else:
+        xArray = createXValues(np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)[gridSlice(xTotalSteps, xStep)]
+        thermoTable = computeThermoTable(xArray, 0.0, 0.0, createThermoTable(len(xArray)))
+        columns = {}
+        for name in ENTROPY_COLUMNS:
+            columns[name] = np.ascontiguousarray(thermoTable[name], dtype=dtype)
+            columns[name].setflags(write=False)
+        del thermoTable
+
+    nBytes = sum(column.nbytes for column in columns.values())
+    if nBytes <= _entropyCacheStats['maxBytes']:
+        _entropyCache[key] = columns
+        _entropyCacheStats['bytes'] += nBytes
+        _evictEntropyCache()
+    return (columns)
+
+
+def computeThermoTableCached (xTotalSteps, xStep, xIncr, eps0, eps1, thermoTable=None, dtype=np.float64):
+
+    columns = getEntropyColumns(xTotalSteps, xStep, xIncr, dtype)
+    x = columns['x']
+    if thermoTable is None:
+        thermoTable = createThermoTable(len(x))
+    for name in ENTROPY_COLUMNS:
+        thermoTable[name] = columns[name]
+    thermoTable['activEnthalpy'] = eps0*x
+    thermoTable['interactEnthalpy'] = -eps1*x*x
+    thermoTable['freeEnergy'] = thermoTable['activEnthalpy'] + thermoTable['interactEnthalpy'] + columns['negX']
+    return (thermoTable)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Persistent on-disk store of the entropy columns, opened as memory maps. 
+#
+# openEntropyStore(cacheDir, ...) writes the ENTROPY_COLUMNS for one grid as .npy files, once, and 
+#   every later call - from this or any other process - opens them with mmap_mode='r', so the 
+#   workers in a batch job share one copy through the page cache rather than each rebuilding it. 
+# The store is built chunk by chunk straight into the memory-mapped files (so grids larger than 
+#   memory are fine) inside a temporary directory, which is then renamed into place; a process 
+#   that loses a race to create the same store simply opens the winner's. 
+# The directory name encodes the grid parameters, the precision mode, the active backend and 
+#   entropyFormulaHash(), a hash of the source of the functions that produce the columns (down to 
+#   xlogy and the JIT kernels); editing those formulas therefore starts a fresh store rather than 
+#   reading stale tables. 
+# Setting setEntropyStoreDir(path), or the CVM_ENTROPY_STORE environment variable, makes 
+#   getEntropyColumns fall back to this store on an in-memory cache miss. 
+#
+####################################################################################################
+####################################################################################################
+
+_entropyStoreConfig = {'cacheDir': os.environ.get('CVM_ENTROPY_STORE')}
+
+
+def setEntropyStoreDir (cacheDir):
+    _entropyStoreConfig['cacheDir'] = cacheDir
+
+
+def entropyFormulaHash ():
+    import inspect
+    digest = hashlib.sha256()
+    # computeThermoTable evaluates through xlogy on the NumPy backend and through the kernels 
+    #   compiled in _loadJitKernels on the jit backend
+    for func in (vecXValues, generateXChunks, computeThermoTable, xlogy, xlogx, vecNegYWEntropy, vecNegXZEntropy, 
+                 vecNegTotEntropy, _loadJitKernels, jitThermoTable):
+        digest.update(inspect.getsource(func).encode('utf-8'))
+    return (digest.hexdigest()[:16])
+
+
+def entropyStorePath (cacheDir, xTotalSteps, xStep, xIncr, dtype=np.float64):
+    name = 'cvm-entropy_n%d_s%d_i%s_%s_%s_%s_%s' % (xTotalSteps, xStep, float(xIncr).hex(), np.dtype(dtype).name, 
+                                                     _precisionConfig['mode'], activeComputeBackend(), entropyFormulaHash())
+    return (os.path.join(cacheDir, name))
+
+
+def _loadEntropyStore (storePath):
+    return ({name: np.load(os.path.join(storePath, name + '.npy'), mmap_mode='r') for name in ENTROPY_COLUMNS})
+
+
+def openEntropyStore (cacheDir, xTotalSteps, xStep, xIncr, dtype=np.float64, chunkSize=DEFAULT_CHUNK_SIZE):
+
+    storePath = entropyStorePath(cacheDir, xTotalSteps, xStep, xIncr, dtype)
+    if os.path.isdir(storePath):
+        return (_loadEntropyStore(storePath))
+
+    os.makedirs(cacheDir, exist_ok=True)
+    tmpPath = tempfile.mkdtemp(prefix='.building-', dir=cacheDir)
+    try:
+        nPoints = len(range(0, xTotalSteps, xStep))
+        columns = {name: np.lib.format.open_memmap(os.path.join(tmpPath, name + '.npy'), mode='w+', dtype=dtype, shape=(nPoints,)) 
+                   for name in ENTROPY_COLUMNS}
+        chunkTable = createThermoTable(min(chunkSize, nPoints))
+        lo = 0
+        for xChunk in generateXChunks(nPoints, xIncr, chunkSize):
+            hi = lo + len(xChunk)
+            thermoTable = computeThermoTable(xChunk, 0.0, 0.0, chunkTable[:len(xChunk)])
+            for name in ENTROPY_COLUMNS:
+                columns[name][lo:hi] = thermoTable[name]
+            lo = hi
+        if lo < nPoints:
+            raise ValueError('The grid of %d points with increment %r runs past x = 1.' % (nPoints, xIncr))
+        for column in columns.values():
+            column.flush()
+        del columns
+        os.rename(tmpPath, storePath)
+    except OSError:
+        # Another process finished the same store first; use theirs
+        shutil.rmtree(tmpPath, ignore_errors=True)
+        if not os.path.isdir(storePath):
+            raise
+    except BaseException:
+        shutil.rmtree(tmpPath, ignore_errors=True)
+        raise
+    return (_loadEntropyStore(storePath))
+
+
+####################################################################################################
+####################################################################################################
+#
+# Multi-core parallel parameter sweep over (eps0, eps1). 
+#
+# sweepFreeEnergy evaluates the simple Ising free energy 
+#     freeEnergy = eps0*x - eps1*x*x + negXEntropy 
+#   for every pair in the outer product eps0Values x eps1Values, over one x-grid, using a pool 
+#   of worker processes. 
+# The x-grid and the (eps-independent) negXEntropy column come from the entropy cache 
+#   (getEntropyColumns), and are copied once, in the parent, into shared memory; the workers attach to those blocks by name, and write their 
+#   results (per-pair minimum of the free energy and its location, and optionally the full 
+#   free-energy rows) straight into shared output blocks. Only row ranges are sent to the 
+#   workers, and nothing but a row count comes back through pickling. 
+#
+####################################################################################################
+####################################################################################################
+
+# Per-process views onto the shared blocks, set up by _initSweepWorker
+_sweepShared = {}
+
+
+def _createSharedArray (shape, sharedBlocks):
+    nBytes = max(int(np.prod(shape)) * 8, 1)
+    block = shared_memory.SharedMemory(create=True, size=nBytes)
+    sharedBlocks.append(block)
+    return (np.ndarray(shape, dtype=np.float64, buffer=block.buf), block.name)
+
+
+def _initSweepWorker (blockSpecs):
+    for key, (blockName, shape) in blockSpecs.items():
+        block = shared_memory.SharedMemory(name=blockName)
+        _sweepShared[key + 'Block'] = block
+        _sweepShared[key] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+def _sweepWorker (rowRange):
+    x = _sweepShared['x']
+    negX = _sweepShared['negX']
+    params = _sweepShared['params']
+    freeEnergy = _sweepShared.get('freeEnergy')
+    xx = x*x
+    row = np.empty_like(x)
+    scratch = np.empty_like(x)
+
+    for p in range(rowRange[0], rowRange[1]):
+        eps0, eps1 = params[p]
+        np.multiply(x, eps0, out=row)
+        np.multiply(xx, eps1, out=scratch)
+        row -= scratch
+        row += negX
+        k = int(np.argmin(row))
+        _sweepShared['minFreeEnergy'][p] = row[k]
+        _sweepShared['xAtMin'][p] = x[k]
+        if freeEnergy is not None:
+            freeEnergy[p] = row
+    return (rowRange[1] - rowRange[0])
+
+
+def sweepFreeEnergy (eps0Values, eps1Values, xTotalSteps, xIncr, xStep=1, nWorkers=None, keepTables=False):
+
+    eps0Values = np.atleast_1d(np.asarray(eps0Values, dtype=np.float64))
+    eps1Values = np.atleast_1d(np.asarray(eps1Values, dtype=np.float64))
+    nWorkers = nWorkers or os.cpu_count() or 1
+    nPoints = len(range(0, xTotalSteps, xStep))
+    nPairs = len(eps0Values) * len(eps1Values)
+
+    sharedBlocks = []
+    try:
+        shared = {}
+        blockSpecs = {}
+        for key, shape in (('x', (nPoints,)), ('negX', (nPoints,)), ('params', (nPairs, 2)), 
+                           ('minFreeEnergy', (nPairs,)), ('xAtMin', (nPairs,))):
+            shared[key], blockName = _createSharedArray(shape, sharedBlocks)
+            blockSpecs[key] = (blockName, shape)
+        if keepTables:
+            shared['freeEnergy'], blockName = _createSharedArray((nPairs, nPoints), sharedBlocks)
+            blockSpecs['freeEnergy'] = (blockName, (nPairs, nPoints))
+
+        entropyColumns = getEntropyColumns(xTotalSteps, xStep, xIncr)
+        shared['x'][:] = entropyColumns['x']
+        shared['negX'][:] = entropyColumns['negX']
+        eps0Grid, eps1Grid = np.meshgrid(eps0Values, eps1Values, indexing='ij')
+        shared['params'][:, 0] = eps0Grid.ravel()
+        shared['params'][:, 1] = eps1Grid.ravel()
+
+        # A few tasks per worker, so that uneven progress still balances out
+        nTasks = min(nPairs, 4 * nWorkers)
+        bounds = np.linspace(0, nPairs, nTasks + 1).astype(int)
+        rowRanges = [(int(bounds[i]), int(bounds[i+1])) for i in range(nTasks)]
+
+        if nWorkers == 1:
+            _initSweepWorker(blockSpecs)
+            for rowRange in rowRanges:
+                _sweepWorker(rowRange)
+            _sweepShared.clear()
+        else:
+            with multiprocessing.Pool(nWorkers, initializer=_initSweepWorker, initargs=(blockSpecs,)) as pool:
+                pool.map(_sweepWorker, rowRanges, chunksize=1)
+
+        result = {'eps0': shared['params'][:, 0].copy(), 'eps1': shared['params'][:, 1].copy(), 
+                  'minFreeEnergy': shared['minFreeEnergy'].copy(), 'xAtMin': shared['xAtMin'].copy(), 
+                  'x': shared['x'].copy()}
+        if keepTables:
+            result['freeEnergy'] = shared['freeEnergy'].copy()
+        del shared
+    finally:
+        for block in sharedBlocks:
+            block.close()
+            block.unlink()
+
+    return (result)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Benchmark for the parallel sweep: the same sweep is timed with 1, 2, 4, ... workers 
+#   (up to the core count), and the speed-up and parallel efficiency relative to one worker 
+#   are printed and returned. 
+#
+####################################################################################################
+####################################################################################################
+
+def benchmarkSweepScaling (nPairs=256, xTotalSteps=100000, workerCounts=None, repeat=3):
+
+    if workerCounts is None:
+        nCores = os.cpu_count() or 1
+        workerCounts = sorted(set([2**k for k in range(nCores.bit_length()) if 2**k <= nCores] + [nCores]))
+    nSide = int(np.ceil(np.sqrt(nPairs)))
+    eps0Values = np.linspace(-2.0, 2.0, nSide)
+    eps1Values = np.linspace(0.0, 1.0, nSide)
+    xIncr = 1.0/(xTotalSteps + 1)
+
+    timings = {}
+    for nWorkers in workerCounts:
+        timings[nWorkers] = bestTime(lambda: sweepFreeEnergy(eps0Values, eps1Values, xTotalSteps, xIncr, nWorkers=nWorkers), 
+                                     repeat)
+
+    print ()
+    print (' Parallel sweep: %d (eps0, eps1) pairs on a %d-point grid' % (nSide*nSide, xTotalSteps))
+    print ()
+    print ('   workers    seconds   speed-up   efficiency')
+    for nWorkers in workerCounts:
+        speedUp = timings[workerCounts[0]] * workerCounts[0] / timings[nWorkers]
+        print ('   %5d' % nWorkers, '   %8.3f' % timings[nWorkers], '   %6.2f' % speedUp, '    %6.2f' % (speedUp / nWorkers))
+    print ()
+    return (timings)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Verification harness for the analytic evaluation mode. 
+# The analytic table is compared column by column against the term-by-term formulas 
+#   (vecNegXEntropy, vecNegYEntropy, vecNegZEntropy, and the combinations built from them). 
+# The error is measured in units in the last place (ulp) of the term-by-term value; 
+#   the maximum ulp error for each column is printed and returned in a dictionary. 
+# Close to x = 0 or x = 1 the term-by-term values are themselves the less accurate ones 
+#   (log(q*q) amplifies the rounding of q*q when log(q) is tiny), so large ulp counts there 
+#   measure the reference, not the analytic mode. 
+#
+####################################################################################################
+####################################################################################################
+
+def ulpError (testArray, referenceArray):
+    return (np.abs(testArray - referenceArray) / np.spacing(np.abs(referenceArray)))
+
+
+def verifyAnalyticEntropy (xArray, printResults=True):
+
+    xArray = np.asarray(xArray, dtype=np.float64)
+    analytic = computeThermoTable(xArray, 0.0, 0.0, createThermoTable(len(xArray)), mode='analytic')
+
+    reference = {}
+    reference['negX'] = vecNegXEntropy(xArray)
+    reference['negY'] = vecNegYEntropy(xArray)
+    reference['negZ'] = vecNegZEntropy(xArray)
+    negW = vecNegWEntropy(xArray)
+    reference['negYW'] = vecNegYWEntropy(reference['negY'], negW)
+    reference['negXZ'] = vecNegXZEntropy(reference['negX'], reference['negZ'])
+    reference['negTot'] = vecNegTotEntropy(reference['negYW'], reference['negXZ'])
+
+    maxUlp = {}
+    for name in reference:
+        maxUlp[name] = float(np.max(ulpError(analytic[name], reference[name])))
+
+    if printResults:
+        print ()
+        print (' Analytic vs. term-by-term entropies, maximum error in ulp:')
+        print ()
+        for name in reference:
+            print ('   %-8s' % name, '   %.1f' % maxUlp[name])
+        print ()
+    return (maxUlp)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Reference scalar-loop implementations. 
+#
+# These are the original per-point loops (one math.log call per term per grid point). 
+#   They are no longer used by main(); they are kept so that the vectorized engine can be 
+#   checked against them (compareVectorAndLoopEngines), and timed against them. 
+#
+####################################################################################################
+####################################################################################################
+
+def createXValuesLoop(xArray, xTotalSteps, xStep, xIncr):
+    newX = 0.0
+    for j in range (0,xTotalSteps, xStep):
+        newX = newX + xIncr
+        xArray[j] = newX
+    return (xArray)
+
+
+def createNegXEntropyValuesLoop(xArray, negXEntropyArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        x = xArray[j]
+        negXEntropyArray[j] = x*log(x) + (1-x)*log(1-x)
+    return (negXEntropyArray)
+
+
+def createNegYEntropyValuesLoop(xArray, negYEntropyArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        x = xArray[j]
+        y1=x*x
+        y2=x*(1.-x)
+        y3=(1.-x)*(1.-x)
+        negYEntropyArray[j] = y1*log(y1) + 2.*(y2)*log(y2) + y3*log(y3)
+    return (negYEntropyArray)
+
+
+def createNegZEntropyValuesLoop(xArray, negZEntropyArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        x = xArray[j]
+        q = 1.0-x
+        z1=x*x*x
+        z2=x*x*q
+        z3=x*q*x
+        z4=q*x*q
+        z5=q*q*x
+        z6=q*q*q
+        negZEntropyArray[j] = z1*log(z1) + 2.*(z2)*log(z2) + z3*log(z3) + z4*log(z4) + 2.*z5*log(z5) + z6*log(z6)
+    return (negZEntropyArray)
+
+
+def createNegYWEntropyValuesLoop(xArray, negYEntropyArray, negYWEntropyArray, xTotalSteps, xStep, xIncr, negWEntropyArray=None):
+    if negWEntropyArray is None:
+        negWEntropyArray = negYEntropyArray
+    for j in range (0,xTotalSteps, xStep):
+        negY = negYEntropyArray[j]
+        negW= negWEntropyArray[j]        
+        negYWEntropyArray[j] = 2*negY + negW
+    return (negYWEntropyArray)
+
+
+def createNegXZEntropyValuesLoop(xArray, negXEntropyArray, negZEntropyArray, negXZEntropyArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        negX = negXEntropyArray[j]
+        negZ = negZEntropyArray[j]        
+        negXZEntropyArray[j] = 2*negZ + negX
+    return (negXZEntropyArray)
+
+
+def createNegTotEntropyValuesLoop(xArray, negYWEntropyArray, negXZEntropyArray, negTotEntropyArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        negYWEntropy = negYWEntropyArray[j]
+        negXZEntropy = negXZEntropyArray[j]        
+        negTotEntropyArray[j] = -(negYWEntropy - negXZEntropy)
+    return (negTotEntropyArray)
+
+
+def createActivationEnthalpyValuesLoop(xArray, activEnthalpyArray, eps0, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        x = xArray[j] 
+        activEnthalpyArray[j] = eps0*x
+    return (activEnthalpyArray)
+
+
+def createInteractEnthalpyValuesLoop(xArray, interactEnthalpyArray, eps1, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        x = xArray[j]
+        interactEnthalpyArray[j] = -eps1*x*x 
+    return (interactEnthalpyArray)
+
+
+def createSimpleIsingValuesLoop(activEnthalpyArray, interactEnthalpyArray, negXEntropyArray, freeEnergyArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        negXEntropy = negXEntropyArray[j]
+        activEnthalpy = activEnthalpyArray[j] 
+        interactEnthalpy = interactEnthalpyArray[j]
+        freeEnergyArray[j] = activEnthalpy + interactEnthalpy + negXEntropy
+    return (freeEnergyArray)
+
+
+def computeEpsilonValuesLoop(xArray, epsilonComputedArray, xTotalSteps, xStep, xIncr):
+    for j in range (0,xTotalSteps, xStep):
+        x = xArray[j]
+        epsilonComputed = -( log(x)-log(1.0-x))
+        epsilonComputedArray[j] = epsilonComputed
+    return (epsilonComputedArray)
+
+
+####################################################################################################
+####################################################################################################
+#
+# Function to check the vectorized engine against the reference loops. 
+# Both engines are run over the same grid, and the largest absolute difference for each column 
+#   is returned in a dictionary keyed by column name. 
+#
+####################################################################################################
+####################################################################################################
+
+def compareVectorAndLoopEngines (xTotalSteps, xStep, xIncr, eps0=1.0, eps1=0.0):
+
+    engines = {}
+    for engine in ('vector', 'loop'):
+        if engine == 'vector':
+            fX, fNegX, fNegY, fNegZ = createXValues, createNegXEntropyValues, createNegYEntropyValues, createNegZEntropyValues
+            fNegYW, fNegXZ, fNegTot = createNegYWEntropyValues, createNegXZEntropyValues, createNegTotEntropyValues
+            fActiv, fInteract, fIsing, fEps = createActivationEnthalpyValues, createInteractEnthalpyValues, createSimpleIsingValues, computeEpsilonValues
+        else:
+            fX, fNegX, fNegY, fNegZ = createXValuesLoop, createNegXEntropyValuesLoop, createNegYEntropyValuesLoop, createNegZEntropyValuesLoop
+            fNegYW, fNegXZ, fNegTot = createNegYWEntropyValuesLoop, createNegXZEntropyValuesLoop, createNegTotEntropyValuesLoop
+            fActiv, fInteract, fIsing, fEps = createActivationEnthalpyValuesLoop, createInteractEnthalpyValuesLoop, createSimpleIsingValuesLoop, computeEpsilonValuesLoop
+
+        cols = {}
+        cols['x']       = fX(np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        x = cols['x']
+        cols['negX']    = fNegX(x, np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        cols['negY']    = fNegY(x, np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        cols['negZ']    = fNegZ(x, np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        negW            = createNegWEntropyValues(x, np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        cols['negYW']   = fNegYW(x, cols['negY'], np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr, negW)
+        cols['negXZ']   = fNegXZ(x, cols['negX'], cols['negZ'], np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        cols['negTot']  = fNegTot(x, cols['negYW'], cols['negXZ'], np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        cols['activEnthalpy']    = fActiv(x, np.zeros(xTotalSteps), eps0, xTotalSteps, xStep, xIncr)
+        cols['interactEnthalpy'] = fInteract(x, np.zeros(xTotalSteps), eps1, xTotalSteps, xStep, xIncr)
+        cols['freeEnergy'] = fIsing(cols['activEnthalpy'], cols['interactEnthalpy'], cols['negX'], np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        cols['epsilon0']   = fEps(x, np.zeros(xTotalSteps), xTotalSteps, xStep, xIncr)
+        engines[engine] = cols
+
+    maxDiff = {}
+    for name in engines['vector']:
+        maxDiff[name] = float(np.max(np.abs(engines['vector'][name] - engines['loop'][name])))
+    return (maxDiff)
\ No newline at end of file